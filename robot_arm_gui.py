@@ -14,7 +14,24 @@ import pygame
 import math
 import csv
 import os
+from collections import deque
 from datetime import datetime
+from robot_arm_metrics import Metrics, MetricsServer, SamplingProfiler
+from robot_arm_trajectory import prepare_playback
+from robot_arm_planner import PickPlacePlanner, GRASP_TEMPLATES
+from robot_arm_transport import open_transport
+from robot_arm_power import schedule_move, peak_current, DEFAULT_POWER_BUDGET_MA
+from robot_arm_state import ArmState, RESET_POSE, SOURCE_USER
+
+# 有对应回复的指令 -> 回复行前缀，只对这些指令统计往返延迟
+REPLY_PREFIXES = {
+    'ping': "pong",
+    'stats': "STATS ",
+    'queue': "Q ",
+    'qstatus': "Q ",
+    'qclear': "Q ",
+    'qblend': "Q ",
+}
 
 class RobotArmGUI:
     def __init__(self, root):
@@ -28,18 +45,32 @@ class RobotArmGUI:
         self.is_connected = False
         self.reading_thread = None
         self.running = False
+        self.connecting = False
+        self.reconnecting = False
+        self.link_ready = threading.Event()        # 串口可用 (路径执行断线时等待它)
+        self.link_generation = 0                   # 每次连接成功加1，路径执行据此发现开发板已重启
+        self.reconnect_cancel = threading.Event()  # 用户手动断开时取消自动重连
+        self.handshake_timeout = 5.0      # 等待固件 "System ready!" / pong 的最长时间
+        self.reconnect_max_delay = 8.0    # 重连退避上限 (秒)
+        self.path_resume_timeout = 15.0   # 路径执行中断线后等待重连的时间
+        # WiFi UDP 地址 (可在端口框中直接输入 udp://<IP>:4210)，127.0.0.1 为本机模拟器
+        self.network_ports = ["udp://127.0.0.1:4210"]
         
         # 调试模式
         self.debug_mode = True
         
-        # 当前舵机位置
-        self.positions = {
+        # 当前舵机位置 (唯一状态来源，变化时只重绘对应控件)
+        self.arm_state = ArmState({
             'servo1': 90,  # Wrist
             'servo2': 90,  # Base
             'servo3': 90,  # Shoulder
             'servo4': 90,  # Elbow
             'servo5': 90   # Gripper
-        }
+        })
+        self._dirty_servos = set()
+        self._redraw_scheduled = False
+        self._programmatic_slider_set = False  # 程序调用 slider.set() 期间忽略滑块回调
+        self._redraw_lock = threading.Lock()
         
         # 游戏手柄
         self.joystick = None
@@ -49,23 +80,54 @@ class RobotArmGUI:
         
         # 路径管理
         self.paths = {}  # {path_name: [(s1, s2, s3, s4, s5), ...]}
+        self.path_times = {}  # 连续录制路径的时间戳 {path_name: [t0, t1, ...]} (秒)
         self.current_path_name = None
-        self.recording = False
+        self.recording = False  # 连续录制进行中
+        self.record_rate = 50.0  # 连续录制采样频率 (Hz)
+        self.stream_rate = 25.0  # 回放时发送 pose 指令的频率 (Hz)
+        self.playback_speeds = {"0.5x": 0.5, "1x": 1.0, "2x": 2.0, "最快": None}
+        self.queue_blend_ms = 150  # 固件运动队列拐角平滑时间
+        self.queue_max_missed = 5  # 连续这么多次收不到 Q 回复则放弃队列，改为逐点执行
+        self.queue_state = None  # 固件最近一次 Q 回复 {'depth', 'free', 'active', 'blend', 'full'}
+        self.queue_update = threading.Event()
+        self.power_budget_ma = DEFAULT_POWER_BUDGET_MA  # 舵机电流预算，路径执行时错开关节启动
         self.paths_dir = "robot_arm_paths"
         
         # 确保路径目录存在
         if not os.path.exists(self.paths_dir):
             os.makedirs(self.paths_dir)
         
+        # 性能统计
+        self.metrics = Metrics()
+        self.profiler = SamplingProfiler()
+        self.metrics_server = MetricsServer(self.metrics, self.profiler)
+        self.stats_window = None
+        
+        # 抓取规划 (缓存保存在路径目录)
+        self.planner = PickPlacePlanner(os.path.join(self.paths_dir, "plan_cache.json"))
+        self.planner_window = None
+        self.executing_plan = False
+        # 等待回复的指令发送时间 {回复前缀: deque}，收到对应回复时统计往返延迟
+        self.reply_waits = {prefix: deque(maxlen=32) for prefix in set(REPLY_PREFIXES.values())}
+        self.reply_wait_timeout = 5.0  # 超过该时间未收到回复视为丢失
+        self.firmware_stats = {}  # 固件 stats 命令返回的最新数据
+        self.firmware_stats_history = deque(maxlen=60)  # [(loop_max_ms, exec_max_ms), ...]
+        self.firmware_poll_var = None
+        
         # 初始化pygame
         pygame.init()
         pygame.joystick.init()
         
         self.setup_ui()
+        self.arm_state.subscribe(self._on_state_change)
         self.refresh_ports()
         self.detect_joystick()
         # 移到setup_ui之后调用，避免UI组件未初始化的问题
         self.load_existing_paths()
+        self.start_metrics_server()
+        self.tk_heartbeat_interval = 0.1
+        self.last_tk_heartbeat = time.perf_counter()
+        self.root.after(int(self.tk_heartbeat_interval * 1000), self._tk_heartbeat)
         
     def setup_ui(self):
         # ===== 串口连接区域 =====
@@ -73,7 +135,7 @@ class RobotArmGUI:
         connection_frame.grid(row=0, column=0, columnspan=3, padx=10, pady=10, sticky="ew")
         
         ttk.Label(connection_frame, text="端口:").grid(row=0, column=0, padx=5)
-        self.port_combo = ttk.Combobox(connection_frame, width=15, state="readonly")
+        self.port_combo = ttk.Combobox(connection_frame, width=22)
         self.port_combo.grid(row=0, column=1, padx=5)
         
         ttk.Button(connection_frame, text="刷新", command=self.refresh_ports).grid(row=0, column=2, padx=5)
@@ -143,6 +205,8 @@ class RobotArmGUI:
             ("保存位置", self.save_position, 0, 3),
             ("发送全部", self.send_all_positions, 1, 0),
             ("停止", self.emergency_stop, 1, 1),
+            ("性能统计", self.open_stats_panel, 1, 2),
+            ("抓取规划", self.open_planner_panel, 1, 3),
         ]
         
         for text, command, row, col in btn_config:
@@ -217,6 +281,32 @@ class RobotArmGUI:
         ttk.Button(path_btn_frame, text="删除路径", command=self.delete_path).pack(side="left", padx=2)
         ttk.Button(path_btn_frame, text="重命名", command=self.rename_path).pack(side="left", padx=2)
         
+        # 连续录制与回放速度
+        record_frame = tk.Frame(path_frame)
+        record_frame.pack(fill="x", pady=5)
+        
+        ttk.Button(record_frame, text="连续录制", command=self.start_continuous_recording).pack(side="left", padx=2)
+        ttk.Button(record_frame, text="停止录制", command=self.stop_recording).pack(side="left", padx=2)
+        ttk.Label(record_frame, text="回放速度:").pack(side="left", padx=(10, 2))
+        self.playback_speed_combo = ttk.Combobox(record_frame, width=6, state="readonly",
+                                                 values=list(self.playback_speeds))
+        self.playback_speed_combo.set("1x")
+        self.playback_speed_combo.pack(side="left")
+        # 固件队列与限流互斥 (默认限流)，见 toggle_motion_queue / toggle_power_limit
+        self.use_queue_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(record_frame, text="固件队列", variable=self.use_queue_var,
+                       command=self.toggle_motion_queue).pack(side="left", padx=5)
+        self.power_limit_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(record_frame, text="限流", variable=self.power_limit_var,
+                       command=self.toggle_power_limit).pack(side="left", padx=(5, 0))
+        self.power_budget_var = tk.StringVar(value=str(self.power_budget_ma))
+        power_spin = ttk.Spinbox(record_frame, from_=100, to=3000, increment=100, width=5,
+                                 textvariable=self.power_budget_var, command=self.apply_power_budget)
+        power_spin.pack(side="left")
+        power_spin.bind("<Return>", lambda e: self.apply_power_budget())
+        power_spin.bind("<FocusOut>", lambda e: self.apply_power_budget())
+        ttk.Label(record_frame, text="mA").pack(side="left", padx=(2, 5))
+        
         # 路径状态
         self.path_status_label = ttk.Label(path_frame, text="未选择路径", foreground="gray")
         self.path_status_label.pack(pady=5)
@@ -228,6 +318,7 @@ class RobotArmGUI:
         ttk.Label(control_info, text="🎮 手柄路径控制:", font=("Arial", 9, "bold"), background="#e8f4f8").pack(anchor="w", padx=5, pady=2)
         ttk.Label(control_info, text="LB键: 记录当前位置到路径", background="#e8f4f8").pack(anchor="w", padx=15)
         ttk.Label(control_info, text="RB键: 停止记录", background="#e8f4f8").pack(anchor="w", padx=15)
+        ttk.Label(control_info, text="Back键: 开始连续录制 (带时间戳)", background="#e8f4f8").pack(anchor="w", padx=15)
         ttk.Label(control_info, text="Y键: 执行路径 (Reset→Path→Reset)", background="#e8f4f8").pack(anchor="w", padx=15)
         ttk.Label(control_info, text="X键: Reset所有舵机到90°", background="#e8f4f8").pack(anchor="w", padx=15)
         
@@ -259,68 +350,194 @@ class RobotArmGUI:
     def refresh_ports(self):
         """刷新可用串口列表"""
         ports = serial.tools.list_ports.comports()
-        port_list = [port.device for port in ports]
+        port_list = [port.device for port in ports] + self.network_ports
         self.port_combo['values'] = port_list
         if port_list:
             self.port_combo.current(0)
             
     def toggle_connection(self):
         """切换串口连接状态"""
-        if not self.is_connected:
-            self.connect()
-        else:
+        if self.is_connected or self.reconnecting:
             self.disconnect()
+        elif not self.connecting:
+            self.connect()
             
     def connect(self):
-        """连接串口"""
+        """连接串口 (后台线程中打开串口并等待固件就绪，不阻塞界面)"""
         port = self.port_combo.get()
         if not port:
             messagebox.showerror("错误", "请选择串口")
             return
-            
+        
+        self.connecting = True
+        self.reconnect_cancel.clear()
+        self.connect_btn.config(state="disabled")
+        self.status_label.config(text=f"正在连接 {port}...", foreground="orange")
+        threading.Thread(target=self._connect_thread, args=(port,), daemon=True).start()
+        
+    def _connect_thread(self, port):
+        """首次连接线程"""
         try:
-            self.serial_port = serial.Serial(port, 115200, timeout=1)
-            time.sleep(2)  # 等待ESP8266重启
-            self.is_connected = True
-            self.connect_btn.config(text="断开")
-            self.status_label.config(text=f"已连接 {port}", foreground="green")
+            ser = self._open_serial(port)
+        except Exception as e:
+            self.root.after(0, self._on_connect_failed, port, str(e))
+            return
+        self.root.after(0, self._on_connected, port, ser, False)
+        
+    def _open_serial(self, port):
+        """打开串口 (或 udp:// 网络连接) 并等待固件就绪
+        打开串口通常会让ESP8266重启，收到 "System ready!" 即可使用；
+        若开发板没有重启，则定期发送 ping，收到 pong 同样视为就绪"""
+        start = time.perf_counter()
+        ser = open_transport(port, timeout=0.1, metrics=self.metrics,
+                             ui_thread=threading.main_thread())
+        try:
+            deadline = time.time() + self.handshake_timeout
+            next_ping = time.time() + 0.3
+            while time.time() < deadline:
+                if self.reconnect_cancel.is_set():
+                    raise ConnectionAbortedError("连接已取消")
+                line = ser.readline().decode('utf-8', errors='ignore').strip()
+                if "System ready!" in line or line == "pong":
+                    self.metrics.observe("connect_handshake_seconds", time.perf_counter() - start)
+                    return ser
+                if time.time() >= next_ping:
+                    ser.write(b"ping\n")
+                    next_ping = time.time() + 0.5
+            raise TimeoutError(f"{self.handshake_timeout:.0f}秒内未收到固件就绪信号")
+        except Exception:
+            ser.close()
+            raise
+        
+    def _on_connect_failed(self, port, error):
+        """首次连接失败 (Tk线程)"""
+        self.connecting = False
+        self.connect_btn.config(text="连接", state="normal")
+        self.status_label.config(text="未连接", foreground="red")
+        if not self.reconnect_cancel.is_set():
+            messagebox.showerror("连接失败", f"无法连接到 {port}\n错误: {error}")
+        
+    def _on_connected(self, port, ser, restored):
+        """串口就绪 (Tk线程)
+        restored=True 表示自动重连成功，需要恢复断线前的姿态"""
+        self.connecting = False
+        self.reconnecting = False
+        if self.reconnect_cancel.is_set():
+            ser.close()
+            return
+        
+        self.serial_port = ser
+        self.is_connected = True
+        self.link_generation += 1
+        self.connect_btn.config(text="断开", state="normal")
+        self.status_label.config(text=f"已连接 {port}", foreground="green")
+        
+        # 启动读取线程 (断线前未收到回复的指令不再配对)
+        for waits in self.reply_waits.values():
+            waits.clear()
+        self.running = True
+        self.reading_thread = threading.Thread(target=self.read_serial, args=(port,), daemon=True)
+        self.reading_thread.start()
+        
+        # 开发板重启后电流预算恢复默认值，先同步再发送其他运动指令
+        self.sync_power_budget()
+        if restored:
+            self.log(f"已重新连接到 {port}，恢复断线前姿态")
+            self.send_all_positions()
+        else:
             self.log(f"成功连接到 {port}")
-            
-            # 启动读取线程
-            self.running = True
-            self.reading_thread = threading.Thread(target=self.read_serial, daemon=True)
-            self.reading_thread.start()
-            
             # 发送 status 命令获取当前位置
-            time.sleep(0.5)
             self.send_command("status")
-            
-        except Exception as e:
-            messagebox.showerror("连接失败", f"无法连接到 {port}\n错误: {str(e)}")
+        self.link_ready.set()
             
     def disconnect(self):
         """断开串口"""
+        self.reconnect_cancel.set()
+        self.reconnecting = False
+        self.link_ready.clear()
         self.running = False
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
         self.is_connected = False
-        self.connect_btn.config(text="连接")
+        self.connect_btn.config(text="连接", state="normal")
         self.status_label.config(text="未连接", foreground="red")
         self.log("已断开连接")
         
-    def read_serial(self):
+    def _on_link_lost(self, port, error):
+        """读取线程检测到串口异常 (如USB线松动)，启动自动重连"""
+        self.running = False
+        self.is_connected = False
+        # 先标记为重连中再清除 link_ready，路径线程在此期间检查时会等待重连而不是中止
+        self.reconnecting = not self.reconnect_cancel.is_set()
+        self.link_ready.clear()
+        self.metrics.inc("serial_link_lost_total")
+        try:
+            self.serial_port.close()
+        except Exception:
+            pass
+        self.log(f"串口连接中断: {error}")
+        self.root.after(0, self._start_reconnect, port)
+        
+    def _start_reconnect(self, port):
+        """开始自动重连 (Tk线程)"""
+        if self.reconnect_cancel.is_set():
+            self.reconnecting = False
+            return
+        self.status_label.config(text=f"连接中断，正在重连 {port}...", foreground="orange")
+        threading.Thread(target=self._reconnect_loop, args=(port,), daemon=True).start()
+        
+    def _reconnect_loop(self, port):
+        """指数退避重连，直到成功或用户手动断开"""
+        delay = 0.5
+        attempt = 0
+        while not self.reconnect_cancel.is_set():
+            attempt += 1
+            try:
+                ser = self._open_serial(port)
+            except Exception as e:
+                if self.reconnect_cancel.is_set():
+                    return
+                self.log(f"重连失败 (第{attempt}次): {str(e)}，{delay:.1f}秒后重试")
+                self.reconnect_cancel.wait(delay)
+                delay = min(delay * 2, self.reconnect_max_delay)
+                continue
+            
+            self.metrics.inc("serial_reconnects_total")
+            self.root.after(0, self._on_connected, port, ser, True)
+            return
+        
+    def read_serial(self, port):
         """读取串口数据线程"""
         while self.running and self.serial_port and self.serial_port.is_open:
+            backlog = 0
             try:
-                if self.serial_port.in_waiting:
+                backlog = self.serial_port.in_waiting
+                self.metrics.set_gauge("serial_rx_backlog_bytes", backlog)
+                if backlog:
                     line = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
                     if line:
+                        self.metrics.inc("serial_lines_received_total")
+                        self._match_reply(line)
+                        if line.startswith("STATS "):
+                            # 固件统计行不写入日志，避免轮询刷屏
+                            self.parse_firmware_stats(line)
+                            continue
+                        if line.startswith("Q depth=") or line.startswith("Q full "):
+                            self.parse_queue_status(line)
+                            continue
                         self.log(f"← {line}")
                         # 解析位置信息
                         self.parse_position(line)
+            except (serial.SerialException, OSError) as e:
+                # 设备断开: 交给自动重连处理
+                if self.running:
+                    self._on_link_lost(port, str(e))
+                return
             except Exception as e:
+                self.metrics.inc("serial_read_errors_total")
                 self.log(f"读取错误: {str(e)}")
-            time.sleep(0.05)
+            if not backlog:
+                time.sleep(0.005)
             
     def parse_position(self, line):
         """解析舵机位置信息"""
@@ -345,11 +562,52 @@ class RobotArmGUI:
             except:
                 pass
                 
+    @property
+    def positions(self):
+        """当前舵机位置 (只读副本，修改请通过 arm_state)"""
+        return self.arm_state.snapshot()
+        
     def update_slider(self, servo_key, angle):
-        """更新滑块位置"""
-        self.positions[servo_key] = angle
-        self.sliders[servo_key].set(angle)
-        self.angle_labels[servo_key].config(text=f"{angle}°")
+        """程序更新舵机位置 (不回发指令)"""
+        self.arm_state.update({servo_key: angle})
+        
+    def set_servo_angle(self, servo_key, angle):
+        """用户操作改变舵机角度: 只有角度真正变化时才发送 set 指令"""
+        changed = self.arm_state.update({servo_key: angle}, SOURCE_USER)
+        if changed:
+            servo_num = int(servo_key[-1])  # servo1 -> 1
+            self.send_command(f"set {servo_num} {changed[servo_key]}")
+        return bool(changed)
+        
+    def _on_state_change(self, changed, source):
+        """状态变化时记录需要重绘的舵机，合并后在Tk线程统一刷新"""
+        with self._redraw_lock:
+            self._dirty_servos.update(changed)
+            if self._redraw_scheduled:
+                return
+            self._redraw_scheduled = True
+        self.root.after(0, self._flush_redraw)
+        
+    def _flush_redraw(self):
+        """只重绘角度变化的滑块和标签"""
+        with self._redraw_lock:
+            dirty = self._dirty_servos
+            self._dirty_servos = set()
+            self._redraw_scheduled = False
+        
+        state = self.arm_state.snapshot()
+        # ttk.Scale.set 会立即调用 command 回调；其他线程可能在快照之后又改了状态，
+        # 回调拿到的是快照中的旧角度，不能当作用户操作，否则会回退状态并回发 set
+        self._programmatic_slider_set = True
+        try:
+            for key in dirty:
+                angle = state[key]
+                if int(float(self.sliders[key].get())) != angle:
+                    self.sliders[key].set(angle)
+                self.angle_labels[key].config(text=f"{angle}°")
+        finally:
+            self._programmatic_slider_set = False
+        self.metrics.inc("widget_redraws_total", len(dirty))
         
     def toggle_debug_mode(self):
         """切换调试模式"""
@@ -413,9 +671,19 @@ class RobotArmGUI:
         """游戏手柄控制循环"""
         clock = pygame.time.Clock()
         deadzone = 0.15  # 死区阈值
+        target_period = 1.0 / 30
+        last_tick = time.perf_counter()
         
         while self.joystick_running and self.joystick:
             try:
+                # 统计循环周期，超过目标周期1.5倍视为超时
+                now = time.perf_counter()
+                period = now - last_tick
+                last_tick = now
+                self.metrics.observe("joystick_loop_period_seconds", period)
+                if period > target_period * 1.5:
+                    self.metrics.inc("joystick_loop_overruns_total")
+                
                 pygame.event.pump()
                 
                 # 读取摇杆值 (-1 到 1)
@@ -477,6 +745,12 @@ class RobotArmGUI:
                         self.record_current_position()
                         self.last_lb_press = time.time()
                 
+                # Back键 - 开始连续录制
+                if self.joystick.get_numbuttons() > 6 and self.joystick.get_button(6):
+                    if not hasattr(self, 'last_back_press') or time.time() - self.last_back_press > 1.0:
+                        self.root.after(0, self.start_continuous_recording)
+                        self.last_back_press = time.time()
+                
                 # RB键 - 停止记录
                 if self.joystick.get_button(5):  # RB键
                     if not hasattr(self, 'last_rb_press') or time.time() - self.last_rb_press > 0.5:
@@ -493,24 +767,14 @@ class RobotArmGUI:
         
     def adjust_angle_smooth(self, servo_key, delta):
         """平滑调整角度"""
-        current = self.positions[servo_key]
-        new_angle = max(0, min(180, current + delta))
-        
-        if new_angle != current:
-            self.positions[servo_key] = new_angle
-            
-            # 安全更新UI控件
-            if servo_key in self.sliders:
-                self.sliders[servo_key].set(new_angle)
-            if servo_key in self.angle_labels:
-                self.angle_labels[servo_key].config(text=f"{new_angle}°")
-            
-            # 发送命令
-            servo_num = int(servo_key[-1])
-            self.send_command(f"set {servo_num} {new_angle}")
+        self.set_servo_angle(servo_key, self.arm_state[servo_key] + delta)
             
     def send_command(self, command):
         """发送命令到串口"""
+        with self.metrics.timer("send_command_seconds"):
+            self._send_command(command)
+            
+    def _send_command(self, command):
         if not self.debug_mode and (not self.is_connected or not self.serial_port):
             messagebox.showwarning("未连接", "请先连接串口或启用调试模式")
             return
@@ -519,13 +783,22 @@ class RobotArmGUI:
         self.log_command(command)
             
         if self.debug_mode:
+            self.metrics.inc("commands_sent_total")
             self.log(f"调试 → {command}")
             return
             
         try:
+            start = time.perf_counter()
             self.serial_port.write(f"{command}\n".encode())
+            elapsed = time.perf_counter() - start
+            self.metrics.observe("serial_write_seconds", elapsed)
+            self.metrics.inc("commands_sent_total")
+            if elapsed > 0.02:
+                self.metrics.inc("serial_write_stalls_total")
+            self._expect_reply(command)
             self.log(f"→ {command}")
         except Exception as e:
+            self.metrics.inc("serial_write_errors_total")
             self.log(f"发送失败: {str(e)}")
             
     def log_command(self, command):
@@ -558,36 +831,34 @@ class RobotArmGUI:
             
     def on_slider_change(self, servo_key, value):
         """滑块值改变时"""
-        angle = int(float(value))
-        self.positions[servo_key] = angle
-        
-        # 检查angle_labels是否已初始化
-        if servo_key in self.angle_labels:
-            self.angle_labels[servo_key].config(text=f"{angle}°")
-        
-        # 发送命令
-        servo_num = int(servo_key[-1])  # servo1 -> 1
-        self.send_command(f"set {servo_num} {angle}")
+        with self.metrics.timer("tk_slider_callback_seconds"):
+            self._on_slider_change(servo_key, value)
+            
+    def _on_slider_change(self, servo_key, value):
+        # 程序调用 slider.set() 触发的回调不是用户操作，不回发指令
+        if self._programmatic_slider_set:
+            self.metrics.inc("slider_echo_suppressed_total")
+            return
+        self.set_servo_angle(servo_key, int(float(value)))
         
     def adjust_angle(self, servo_key, delta):
         """调整舵机角度"""
-        current = self.positions[servo_key]
-        new_angle = max(0, min(180, current + delta))
-        self.sliders[servo_key].set(new_angle)
+        self.set_servo_angle(servo_key, self.arm_state[servo_key] + delta)
         
     def reset_all(self):
-        """重置所有舵机到90度"""
+        """重置所有舵机到初始位置 (与固件 reset 一致)"""
         self.send_command("reset")
-        for key in self.sliders:
-            self.sliders[key].set(90)
+        self.arm_state.update(RESET_POSE)
             
     def open_gripper(self):
         """打开夹爪"""
         self.send_command("open")
+        self.arm_state.update({'servo5': 30})
         
     def close_gripper(self):
         """关闭夹爪"""
         self.send_command("close")
+        self.arm_state.update({'servo5': 90})
         
     def save_position(self):
         """保存当前位置"""
@@ -611,6 +882,290 @@ class RobotArmGUI:
         self.log_text.see("end")
         self.log_text.config(state="disabled")
         
+    # ===== 性能统计 =====
+    
+    def start_metrics_server(self):
+        """启动本地 /metrics 端点"""
+        try:
+            self.metrics_server.start()
+            self.log(f"性能统计端点: {self.metrics_server.address}")
+        except OSError as e:
+            self.log(f"性能统计端点启动失败: {str(e)}")
+    
+    def _tk_heartbeat(self):
+        """定时心跳，用实际间隔与预期间隔之差衡量Tk回调阻塞时间"""
+        now = time.perf_counter()
+        lag = max(0.0, now - self.last_tk_heartbeat - self.tk_heartbeat_interval)
+        self.metrics.observe("tk_loop_lag_seconds", lag)
+        self.last_tk_heartbeat = now
+        self.root.after(int(self.tk_heartbeat_interval * 1000), self._tk_heartbeat)
+    
+    def open_stats_panel(self):
+        """打开性能统计面板"""
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            return
+        
+        self.stats_window = tk.Toplevel(self.root)
+        self.stats_window.title("性能统计")
+        self.stats_window.geometry("640x520")
+        
+        top_frame = tk.Frame(self.stats_window)
+        top_frame.pack(fill="x", padx=10, pady=5)
+        
+        ttk.Label(top_frame, text=f"端点: {self.metrics_server.address}").pack(side="left")
+        
+        self.profiler_var = tk.BooleanVar(value=self.profiler.running)
+        ttk.Checkbutton(top_frame, text="采样分析器", variable=self.profiler_var,
+                       command=self.toggle_profiler).pack(side="right", padx=5)
+        
+        self.firmware_poll_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="轮询固件统计", variable=self.firmware_poll_var,
+                       command=self.poll_firmware_stats).pack(side="right", padx=5)
+        
+        # 固件循环周期 / 指令执行时间 折线图
+        self.stats_canvas = tk.Canvas(self.stats_window, height=120, bg="white")
+        self.stats_canvas.pack(fill="x", padx=10, pady=5)
+        
+        self.stats_text = tk.Text(self.stats_window, height=24, width=80, state="disabled",
+                                  font=("Consolas", 9))
+        self.stats_text.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        self._refresh_stats_panel()
+    
+    def toggle_profiler(self):
+        """启动/停止采样分析器"""
+        if self.profiler_var.get():
+            self.profiler.reset()
+            self.profiler.start()
+            self.log("采样分析器已启动")
+        else:
+            self.profiler.stop()
+            self.log("采样分析器已停止")
+    
+    def _refresh_stats_panel(self):
+        """每秒刷新一次统计面板"""
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            self.stats_window = None
+            return
+        
+        text = self.metrics.format_summary()
+        if self.firmware_stats:
+            text += "\n\n== 固件统计 ==\n"
+            text += "\n".join(f"{k}: {v}" for k, v in self.firmware_stats.items())
+        self._draw_firmware_chart()
+        if self.profiler.running or self.profiler.total_samples:
+            text += "\n\n== 采样分析 ==\n" + self.profiler.format_report(15)
+        
+        self.stats_text.config(state="normal")
+        self.stats_text.delete(1.0, "end")
+        self.stats_text.insert("end", text)
+        self.stats_text.config(state="disabled")
+        self.stats_window.after(1000, self._refresh_stats_panel)
+    
+    def poll_firmware_stats(self):
+        """勾选后每秒向固件发送一次 stats 命令"""
+        if self.firmware_poll_var is None or not self.firmware_poll_var.get():
+            return
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            return
+        
+        self._write_quiet("stats")
+        self.root.after(1000, self.poll_firmware_stats)
+    
+    def _write_quiet(self, command):
+        """直接写串口，不记录到指令历史 (用于轮询类指令)"""
+        if not self.is_connected or self.debug_mode or not self.serial_port:
+            return
+        try:
+            self.serial_port.write(f"{command}\n".encode())
+            self._expect_reply(command)
+        except Exception as e:
+            self.log(f"发送失败: {str(e)}")
+    
+    def _expect_reply(self, command):
+        """记录有对应回复的指令 (ping/stats/队列指令) 的发送时间"""
+        prefix = REPLY_PREFIXES.get(command.split(' ', 1)[0])
+        if prefix is None or command == "stats reset":
+            return
+        self.reply_waits[prefix].append(time.perf_counter())
+    
+    def _match_reply(self, line):
+        """收到回复行时与最早的同类指令配对，统计往返延迟"""
+        for prefix, waits in self.reply_waits.items():
+            if not line.startswith(prefix):
+                continue
+            now = time.perf_counter()
+            while waits:
+                sent = waits.popleft()
+                if now - sent <= self.reply_wait_timeout:
+                    self.metrics.observe("command_rtt_seconds", now - sent)
+                    break
+                self.metrics.inc("command_replies_lost_total")
+            return
+    
+    def parse_firmware_stats(self, line):
+        """解析固件统计行
+        示例: STATS loop_us=3/5/120 parse_us=... exec_us=... last_exec_us=80 loops=1234 ..."""
+        stats = {}
+        for field in line.split()[1:]:
+            if "=" not in field:
+                continue
+            key, value = field.split("=", 1)
+            stats[key] = value
+            try:
+                if "/" in value:
+                    vmin, vavg, vmax = (int(v) for v in value.split("/"))
+                    self.metrics.set_gauge(f"firmware_{key}_min", vmin)
+                    self.metrics.set_gauge(f"firmware_{key}_avg", vavg)
+                    self.metrics.set_gauge(f"firmware_{key}_max", vmax)
+                else:
+                    self.metrics.set_gauge(f"firmware_{key}", int(value))
+            except ValueError:
+                pass
+        
+        self.firmware_stats = stats
+        try:
+            loop_max = int(stats.get("loop_us", "0/0/0").split("/")[2]) / 1000
+            exec_max = int(stats.get("exec_us", "0/0/0").split("/")[2]) / 1000
+            self.firmware_stats_history.append((loop_max, exec_max))
+        except (ValueError, IndexError):
+            pass
+    
+    def _draw_firmware_chart(self):
+        """绘制固件最大循环周期(蓝)与最大指令执行时间(红)"""
+        canvas = self.stats_canvas
+        canvas.delete("all")
+        history = list(self.firmware_stats_history)
+        if len(history) < 2:
+            canvas.create_text(10, 10, anchor="nw", text="无固件统计数据 (勾选\"轮询固件统计\")",
+                               fill="gray")
+            return
+        
+        width = max(canvas.winfo_width(), 200)
+        height = int(canvas["height"])
+        peak = max(max(loop, exe) for loop, exe in history) or 1.0
+        step = width / (self.firmware_stats_history.maxlen - 1)
+        
+        for index, color in ((0, "blue"), (1, "red")):
+            points = []
+            for i, sample in enumerate(history):
+                points.extend((i * step, height - 5 - sample[index] / peak * (height - 20)))
+            canvas.create_line(*points, fill=color)
+        canvas.create_text(5, 5, anchor="nw", text=f"峰值 {peak:.1f} ms  蓝: 循环周期  红: 指令执行")
+    
+    # ===== 抓取规划 =====
+    
+    def open_planner_panel(self):
+        """打开抓取规划面板"""
+        if self.planner_window is not None and self.planner_window.winfo_exists():
+            self.planner_window.lift()
+            return
+        
+        self.planner_window = tk.Toplevel(self.root)
+        self.planner_window.title("抓取规划")
+        self.planner_window.geometry("460x260")
+        
+        frame = ttk.Frame(self.planner_window, padding=10)
+        frame.pack(fill="both", expand=True)
+        
+        ttk.Label(frame, text="物品:").grid(row=0, column=0, sticky="w", pady=5)
+        self.plan_object_combo = ttk.Combobox(frame, width=12, state="readonly",
+                                              values=list(GRASP_TEMPLATES))
+        self.plan_object_combo.current(0)
+        self.plan_object_combo.grid(row=0, column=1, sticky="w", pady=5)
+        
+        # 姿态输入: 5个角度，顺序 servo1..servo5
+        self.plan_entries = {}
+        for row, (key, label) in enumerate((("pick", "抓取姿态:"), ("place", "放置姿态:")), start=1):
+            ttk.Label(frame, text=label).grid(row=row, column=0, sticky="w", pady=5)
+            entry = ttk.Entry(frame, width=24)
+            entry.grid(row=row, column=1, sticky="w", pady=5)
+            self.plan_entries[key] = entry
+            ttk.Button(frame, text="使用当前位置",
+                       command=lambda k=key: self._fill_plan_pose(k)).grid(row=row, column=2, padx=5)
+        ttk.Label(frame, text="格式: 腕部 底座 肩部 肘部 夹爪 (servo1..servo5)",
+                  foreground="gray").grid(row=3, column=0, columnspan=3, sticky="w")
+        
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=4, column=0, columnspan=3, pady=10)
+        ttk.Button(btn_frame, text="规划并执行", command=lambda: self.run_pick_place(True)).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="保存为路径", command=lambda: self.run_pick_place(False)).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="清空缓存", command=self.clear_plan_cache).pack(side="left", padx=5)
+        
+        self.plan_status_label = ttk.Label(frame, text=f"缓存: {len(self.planner.cache)}条规划",
+                                           foreground="gray")
+        self.plan_status_label.grid(row=5, column=0, columnspan=3, sticky="w")
+    
+    def _fill_plan_pose(self, key):
+        """把当前舵机位置填入输入框"""
+        entry = self.plan_entries[key]
+        entry.delete(0, tk.END)
+        entry.insert(0, " ".join(str(self.positions[f'servo{i}']) for i in range(1, 6)))
+    
+    def _read_plan_pose(self, key):
+        """读取输入框中的5个角度"""
+        values = self.plan_entries[key].get().split()
+        if len(values) != 5:
+            raise ValueError("需要5个角度")
+        pose = tuple(int(v) for v in values)
+        if any(a < 0 or a > 180 for a in pose):
+            raise ValueError("角度必须在0-180之间")
+        return pose
+    
+    def run_pick_place(self, execute):
+        """规划抓取-放置轨迹，execute=True 时立即执行，否则保存为连续路径"""
+        object_type = self.plan_object_combo.get()
+        try:
+            pick = self._read_plan_pose("pick")
+            place = self._read_plan_pose("place")
+        except ValueError as e:
+            messagebox.showerror("错误", f"姿态格式错误: {str(e)}")
+            return
+        
+        start_pose = tuple(self.positions[f'servo{i}'] for i in range(1, 6))
+        with self.metrics.timer("plan_seconds"):
+            plan, cached = self.planner.plan(object_type, start_pose, pick, place)
+        self.metrics.inc("plan_cache_hits_total" if cached else "plan_cache_misses_total")
+        
+        phases = ", ".join(f"{p['name']} {p['end'] - p['start']:.2f}s" for p in plan['phases'])
+        self.log(f"抓取规划 {object_type} ({'缓存' if cached else '新规划'}): {phases}")
+        self.plan_status_label.config(text=f"缓存: {len(self.planner.cache)}条规划  "
+                                           f"总时长 {plan['times'][-1]:.2f}秒")
+        
+        if execute:
+            if self.executing_plan:
+                self.log("已有规划正在执行")
+                return
+            threading.Thread(target=self._execute_plan_thread, args=(plan,), daemon=True).start()
+            return
+        
+        # 保存为连续路径，可在路径管理器中回放
+        path_name = f"plan_{object_type}_{datetime.now().strftime('%H%M%S')}"
+        self.paths[path_name] = [tuple(p) for p in plan['positions']]
+        self.path_times[path_name] = list(plan['times'])
+        self.path_listbox.insert(tk.END, path_name)
+        self.save_path_to_csv(path_name)
+    
+    def _execute_plan_thread(self, plan):
+        """执行规划好的轨迹"""
+        self.executing_plan = True
+        try:
+            times, positions = prepare_playback(plan['times'], plan['positions'],
+                                                rate=self.stream_rate, trim=False)
+            if self._stream_trajectory(times, positions):
+                self.log(f"抓取完成: {plan['object']}")
+        except Exception as e:
+            self.log(f"执行规划错误: {str(e)}")
+        finally:
+            self.executing_plan = False
+    
+    def clear_plan_cache(self):
+        """清空规划缓存"""
+        self.planner.cache.clear()
+        self.plan_status_label.config(text="缓存: 0条规划")
+        self.log("规划缓存已清空")
+    
     # ===== 路径管理功能 =====
     
     def load_existing_paths(self):
@@ -675,6 +1230,7 @@ class RobotArmGUI:
             # 从内存删除
             if path_name in self.paths:
                 del self.paths[path_name]
+            self.path_times.pop(path_name, None)
             
             # 从列表框删除
             self.path_listbox.delete(selection[0])
@@ -724,6 +1280,8 @@ class RobotArmGUI:
             
             # 更新内存
             self.paths[new_name] = self.paths.pop(old_name)
+            if old_name in self.path_times:
+                self.path_times[new_name] = self.path_times.pop(old_name)
             
             # 更新列表框
             self.path_listbox.delete(selection[0])
@@ -749,7 +1307,6 @@ class RobotArmGUI:
             self.current_path_name = path_name
             point_count = len(self.paths.get(path_name, []))
             self.path_status_label.config(text=f"当前路径: {path_name} ({point_count}个点)", foreground="blue")
-            self.recording = False
     
     def record_current_position(self):
         """记录当前位置到路径"""
@@ -757,6 +1314,14 @@ class RobotArmGUI:
             messagebox.showwarning("警告", "请先选择一个路径")
             return
         
+        if self.recording:
+            self.log("连续录制进行中，不能添加单个位置")
+            return
+        
+        if self.current_path_name in self.path_times:
+            self.log("连续录制的路径不能再添加单个位置，请新建路径")
+            return
+        
         # 获取当前所有舵机位置
         current_pos = (
             self.positions['servo1'],
@@ -781,9 +1346,63 @@ class RobotArmGUI:
         
         self.log(f"记录位置到 '{self.current_path_name}': {current_pos}")
     
+    def start_continuous_recording(self):
+        """开始连续录制: 按 record_rate 采样当前位置并记录时间戳"""
+        if self.recording:
+            return
+        if not self.current_path_name:
+            messagebox.showwarning("警告", "请先选择一个路径")
+            return
+        
+        path_name = self.current_path_name
+        if self.paths.get(path_name) and not messagebox.askyesno(
+                "确认", f"路径 '{path_name}' 已有数据，连续录制将覆盖，是否继续？"):
+            return
+        
+        self.recording = True
+        threading.Thread(target=self._continuous_record_thread, args=(path_name,), daemon=True).start()
+        self.path_status_label.config(text=f"当前路径: {path_name} - 连续录制中...", foreground="red")
+        self.log(f"开始连续录制: {path_name}")
+    
+    def _continuous_record_thread(self, path_name):
+        """连续录制线程，停止后保存带时间戳的路径"""
+        interval = 1.0 / self.record_rate
+        start = time.perf_counter()
+        next_sample = start
+        times = []
+        samples = []
+        
+        while self.recording:
+            now = time.perf_counter()
+            times.append(round(now - start, 3))
+            samples.append(self.arm_state.pose())
+            next_sample += interval
+            time.sleep(max(0.0, next_sample - time.perf_counter()))
+        
+        if path_name not in self.paths:
+            return  # 录制期间路径被删除
+        self.paths[path_name] = samples
+        self.path_times[path_name] = times
+        self.save_path_to_csv(path_name)
+        self.log(f"连续录制完成: {path_name} ({len(samples)}个采样, {times[-1] if times else 0:.1f}秒)")
+        self.root.after(0, self._show_recorded_path, path_name)
+    
+    def _show_recorded_path(self, path_name):
+        """连续录制保存后更新路径状态 (Tk线程)"""
+        if path_name == self.current_path_name:
+            self.path_status_label.config(
+                text=f"当前路径: {path_name} ({len(self.paths[path_name])}个点) - 已停止",
+                foreground="orange"
+            )
+    
     def stop_recording(self):
         """停止记录"""
-        self.recording = False
+        if self.recording:
+            # 采样由录制线程保存，保存后再显示点数
+            self.recording = False
+            self.path_status_label.config(text="连续录制已停止，正在保存...", foreground="orange")
+            self.log("停止连续录制")
+            return
         if self.current_path_name:
             point_count = len(self.paths[self.current_path_name])
             self.path_status_label.config(
@@ -814,25 +1433,32 @@ class RobotArmGUI:
             self.reset_all()
             time.sleep(2)
             
-            # 2. 执行路径中的每个位置
-            for i, pos in enumerate(self.paths[self.current_path_name]):
-                self.log(f"执行第{i+1}个位置: {pos}")
-                
-                # 发送move命令
-                command = f"move {pos[0]} {pos[1]} {pos[2]} {pos[3]} {pos[4]}"
-                self.send_command(command)
-                
-                # 更新GUI显示
-                self.update_slider("servo1", pos[0])
-                self.update_slider("servo2", pos[1])
-                self.update_slider("servo3", pos[2])
-                self.update_slider("servo4", pos[3])
-                self.update_slider("servo5", pos[4])
-                
-                time.sleep(1.5)  # 等待机械臂移动到位
+            # 2. 连续录制的路径按原始时间回放
+            if self.current_path_name in self.path_times:
+                if not self._play_timed_path(self.current_path_name):
+                    return
+                time.sleep(1)
+                if not self._wait_for_link():
+                    self.log("串口未恢复，跳过结束复位")
+                    return
+                self.reset_all()
+                self.log(f"路径执行完成: {self.current_path_name}")
+                return
+            
+            # 执行路径中的每个位置
+            path = self.paths[self.current_path_name]
+            if self.use_queue_var.get() and not self.debug_mode:
+                completed = self._run_path_queued(path)
+            else:
+                completed = self._run_path_stepwise(path)
+            if not completed:
+                return
             
             # 3. Reset
             time.sleep(1)
+            if not self._wait_for_link():
+                self.log("串口未恢复，跳过结束复位")
+                return
             self.reset_all()
             
             self.log(f"路径执行完成: {self.current_path_name}")
@@ -840,16 +1466,229 @@ class RobotArmGUI:
         except Exception as e:
             self.log(f"执行路径错误: {str(e)}")
     
+    def _run_path_stepwise(self, path):
+        """逐点发送 move 并等待机械臂到位，返回是否完成"""
+        i = 0
+        while i < len(path):
+            pos = path[i]
+            if not self._wait_for_link():
+                self.log(f"串口未恢复，路径已中止于第{i+1}个位置")
+                return False
+            self.log(f"执行第{i+1}个位置: {pos}")
+            step_start = time.perf_counter()
+            
+            if self.power_limit_var.get():
+                # 限流: 按排程错开各关节的 set 指令
+                self._move_power_limited(pos)
+            else:
+                # 发送move命令
+                command = f"move {pos[0]} {pos[1]} {pos[2]} {pos[3]} {pos[4]}"
+                self.send_command(command)
+                
+                # 更新状态，界面只重绘变化的舵机
+                self.arm_state.update_pose(pos)
+            
+            # 等待机械臂移动到位
+            time.sleep(max(0.0, 1.5 - (time.perf_counter() - step_start)))
+            
+            # 执行期间断线: 重连后重新发送该位置
+            if not self.debug_mode and not self.link_ready.is_set():
+                continue
+            i += 1
+        return True
+    
+    def _move_power_limited(self, pos):
+        """按电流预算错开各舵机启动时间，逐个发送 set 指令并等待全部到位"""
+        current = self.arm_state.pose()
+        starts, total = schedule_move(current, pos, self.power_budget_ma)
+        self.metrics.set_gauge("power_peak_estimate_ma", peak_current(current, pos, starts))
+        
+        begin = time.perf_counter()
+        for index in sorted(range(5), key=lambda k: starts[k]):
+            if current[index] == pos[index]:
+                continue
+            delay = begin + starts[index] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.send_command(f"set {index + 1} {pos[index]}")
+            self.update_slider(f"servo{index + 1}", pos[index])
+        
+        time.sleep(max(0.0, begin + total - time.perf_counter()))
+    
+    def apply_power_budget(self):
+        """读取电流预算输入框，变化时同步到固件"""
+        try:
+            budget = int(self.power_budget_var.get())
+            if budget <= 0:
+                raise ValueError
+        except ValueError:
+            self.power_budget_var.set(str(self.power_budget_ma))
+            return
+        if budget != self.power_budget_ma:
+            self.power_budget_ma = budget
+            self.log(f"电流预算: {budget} mA")
+            self.sync_power_budget()
+    
+    def toggle_motion_queue(self):
+        """勾选固件队列时关闭限流: 队列中每个路径点所有舵机同时运动，无法按电流预算错开"""
+        if self.use_queue_var.get() and self.power_limit_var.get():
+            self.power_limit_var.set(False)
+            self.sync_power_budget()
+            self.log("固件队列不按电流预算错开关节，已关闭限流")
+    
+    def toggle_power_limit(self):
+        """勾选限流时关闭固件队列，路径改为逐点执行；并同步电流预算到固件"""
+        if self.power_limit_var.get() and self.use_queue_var.get():
+            self.use_queue_var.set(False)
+            self.log("限流时路径逐点执行，已关闭固件队列")
+        self.sync_power_budget()
+    
+    def sync_power_budget(self):
+        """把电流预算同步到固件 (move/reset 使用)，关闭限流时设为0"""
+        budget = self.power_budget_ma if self.power_limit_var.get() else 0
+        if self.is_connected and not self.debug_mode:
+            self.send_command(f"power {budget}")
+    
+    def _run_path_queued(self, path):
+        """通过固件运动队列执行路径: 提前发送路径点，机械臂在点之间不停顿
+        每条 queue 指令等待固件的 Q 回复，队列满时轮询 qstatus，返回是否完成。
+        每次 Q 回复后按 depth/active 推算已执行完的点数；自动重连后开发板已重启、队列为空，
+        从第一个未确认执行完的点重新加入队列。
+        连接正常但连续 queue_max_missed 次没有 Q 回复 (如固件不支持队列) 时清空队列，
+        剩余的点改为逐点执行"""
+        generation = None
+        sent = 0  # 固件已接受的路径点数
+        done = 0  # 确认已执行完的路径点数
+        state = None
+        missed = 0  # 连续没有 Q 回复的次数
+        while done < len(path):
+            if not self._wait_for_link():
+                self.log(f"串口未恢复，路径已中止于第{done+1}个位置")
+                return False
+            
+            if generation != self.link_generation:
+                if generation is not None:
+                    self.log(f"开发板已重启，从第{done+1}个位置重新加入队列")
+                generation = self.link_generation
+                sent = done
+                state = None
+                missed = 0
+                self._write_quiet(f"qblend {self.queue_blend_ms}")
+            
+            if sent < len(path) and state is not None and state['free'] > 0:
+                pos = path[sent]
+                self.log(f"加入队列第{sent+1}个位置: {pos}")
+                state = self._queue_request(f"queue {' '.join(map(str, pos))}", quiet=False)
+                if state is not None and not state['full']:
+                    sent += 1
+                # 队列满或没有回复 (可能断线) 时重新查询后再发送该点
+            else:
+                if state is not None:
+                    time.sleep(0.05 if sent < len(path) else 0.1)
+                state = self._query_queue()
+            
+            if generation != self.link_generation:
+                continue
+            if state is None:
+                if self.link_ready.is_set():
+                    missed += 1
+                if missed >= self.queue_max_missed:
+                    self.log(f"固件队列连续{missed}次无回复，从第{done+1}个位置改为逐点执行")
+                    self._write_quiet("qclear")
+                    return self._run_path_stepwise(path[done:])
+                continue
+            missed = 0
+            executed = sent - state['depth'] - state['active']
+            if executed > done:
+                done = executed
+                self.arm_state.update_pose(path[done - 1])
+        
+        return True
+    
+    def _query_queue(self):
+        """发送 qstatus 并等待回复，返回队列状态 (超时返回None)"""
+        return self._queue_request("qstatus")
+    
+    def _queue_request(self, command, quiet=True):
+        """发送队列指令并等待 Q 回复，返回队列状态 (超时返回None)"""
+        self.queue_update.clear()
+        if quiet:
+            self._write_quiet(command)
+        else:
+            self.send_command(command)
+        if self.queue_update.wait(0.5):
+            return self.queue_state
+        return None
+    
+    def parse_queue_status(self, line):
+        """解析队列状态行，示例: Q depth=3 free=13 active=1 blend=150
+        加入队列被拒绝 (队列满) 时为 Q full depth=16 free=0 ..."""
+        state = {'full': line.startswith("Q full ")}
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            try:
+                state[key] = int(value)
+            except ValueError:
+                pass
+        if 'free' in state:
+            self.queue_state = state
+            self.metrics.set_gauge("firmware_queue_depth", state.get('depth', 0))
+            self.queue_update.set()
+    
+    def _play_timed_path(self, path_name):
+        """按录制时间 (可缩放) 以固定频率流式发送 pose 指令，返回是否完成"""
+        speed = self.playback_speeds.get(self.playback_speed_combo.get(), 1.0)
+        times, positions = prepare_playback(self.path_times[path_name], self.paths[path_name],
+                                            speed=speed, rate=self.stream_rate)
+        self.log(f"回放 {path_name}: {len(times)}帧, 时长{times[-1]:.2f}秒")
+        return self._stream_trajectory(times, positions)
+    
+    def _stream_trajectory(self, times, positions):
+        """按时间表流式发送 pose 指令，返回是否完成 (断线超时返回False)"""
+        start = time.perf_counter()
+        for t, pos in zip(times, positions):
+            delay = start + t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not self.debug_mode and not self.link_ready.is_set():
+                if not self._wait_for_link():
+                    self.log(f"串口未恢复，回放已中止于 {t:.2f}秒")
+                    return False
+                start = time.perf_counter() - t  # 重连后从当前帧继续计时
+            
+            self.send_command(f"pose {' '.join(map(str, pos))}")
+            self.arm_state.update_pose(pos)
+        return True
+    
+    def _wait_for_link(self):
+        """路径执行前检查串口；正在自动重连时最多等待 path_resume_timeout 秒"""
+        if self.debug_mode or self.link_ready.is_set():
+            return True
+        if not self.reconnecting:
+            return False
+        self.log("串口断开，路径暂停，等待重连...")
+        if self.link_ready.wait(self.path_resume_timeout):
+            self.log("串口已恢复，继续执行路径")
+            return True
+        return False
+    
     def save_path_to_csv(self, path_name):
         """保存路径到CSV文件"""
         try:
             csv_path = os.path.join(self.paths_dir, f"{path_name}.csv")
+            header = ['Servo1_Wrist', 'Servo2_Base', 'Servo3_Shoulder', 'Servo4_Elbow', 'Servo5_Gripper']
+            times = self.path_times.get(path_name)
             with open(csv_path, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(['Servo1_Wrist', 'Servo2_Base', 'Servo3_Shoulder', 'Servo4_Elbow', 'Servo5_Gripper'])
-                
-                for pos in self.paths.get(path_name, []):
-                    writer.writerow(pos)
+                if times is not None:
+                    # 连续录制路径: 第一列为时间戳 (秒)
+                    writer.writerow(['Time_s'] + header)
+                    for t, pos in zip(times, self.paths.get(path_name, [])):
+                        writer.writerow([f"{t:.3f}", *pos])
+                else:
+                    writer.writerow(header)
+                    for pos in self.paths.get(path_name, []):
+                        writer.writerow(pos)
             
             self.log(f"路径已保存: {csv_path}")
         except Exception as e:
@@ -860,17 +1699,24 @@ class RobotArmGUI:
         try:
             csv_path = os.path.join(self.paths_dir, f"{path_name}.csv")
             positions = []
+            times = []
             
             with open(csv_path, 'r', encoding='utf-8') as f:
                 reader = csv.reader(f)
-                next(reader)  # 跳过标题行
+                header = next(reader)  # 标题行
+                timed = bool(header) and header[0] == 'Time_s'
                 
                 for row in reader:
-                    if len(row) == 5:
+                    if timed and len(row) == 6:
+                        times.append(float(row[0]))
+                        positions.append(tuple(int(x) for x in row[1:]))
+                    elif not timed and len(row) == 5:
                         pos = tuple(int(x) for x in row)
                         positions.append(pos)
             
             self.paths[path_name] = positions
+            if timed:
+                self.path_times[path_name] = times
             self.log(f"加载路径: {path_name} ({len(positions)}个点)")
             
         except Exception as e:
@@ -878,6 +1724,9 @@ class RobotArmGUI:
         
     def on_closing(self):
         """关闭窗口时"""
+        # 停止连续录制
+        self.recording = False
+        
         # 停止游戏手柄控制
         if self.joystick_running:
             self.stop_joystick_control()
@@ -885,7 +1734,11 @@ class RobotArmGUI:
         # 清理pygame
         pygame.quit()
         
-        if self.is_connected:
+        # 停止性能统计
+        self.profiler.stop()
+        self.metrics_server.stop()
+        
+        if self.is_connected or self.reconnecting:
             self.disconnect()
         self.root.destroy()
 
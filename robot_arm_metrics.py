@@ -0,0 +1,254 @@
+"""
+ISDN 2601 机械臂 性能统计模块
+提供计时器、计数器、直方图、采样分析器以及本地 HTTP /metrics 端点
+只依赖标准库，GUI 和其他脚本都可以直接使用
+"""
+
+import sys
+import threading
+import time
+import json
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 直方图默认分桶 (秒)，覆盖 0.5ms ~ 2.5s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """固定分桶直方图，同时记录 count/sum/min/max"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'avg': self.avg,
+            'min': self.min or 0.0,
+            'max': self.max or 0.0,
+        }
+
+
+class Metrics:
+    """线程安全的指标集合: 计数器 / 仪表 / 直方图"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name, value):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name):
+        """计时上下文: with metrics.timer('send_command_seconds'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """返回当前所有指标的字典副本"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {k: h.to_dict() for k, h in self.histograms.items()},
+            }
+
+    def render_prometheus(self, prefix="robot_arm_"):
+        """按 Prometheus 文本格式输出"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                lines.append(f"{prefix}{name} {value}")
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {prefix}{name} gauge")
+                lines.append(f"{prefix}{name} {value}")
+            for name, hist in sorted(self.histograms.items()):
+                full = prefix + name
+                lines.append(f"# TYPE {full} histogram")
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{full}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{full}_bucket{{le="+Inf"}} {hist.count}')
+                lines.append(f"{full}_sum {hist.total}")
+                lines.append(f"{full}_count {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self):
+        """生成适合在 GUI 面板显示的简要文本"""
+        snap = self.snapshot()
+        lines = ["== 计数器 =="]
+        for name, value in sorted(snap['counters'].items()):
+            lines.append(f"{name}: {value}")
+        lines.append("")
+        lines.append("== 仪表 ==")
+        for name, value in sorted(snap['gauges'].items()):
+            lines.append(f"{name}: {value}")
+        lines.append("")
+        lines.append("== 耗时 (ms) count / avg / min / max ==")
+        for name, h in sorted(snap['histograms'].items()):
+            lines.append(f"{name}: {h['count']} / {h['avg'] * 1000:.2f} / "
+                         f"{h['min'] * 1000:.2f} / {h['max'] * 1000:.2f}")
+        return "\n".join(lines)
+
+
+class SamplingProfiler:
+    """采样分析器: 后台线程定期抓取所有线程的栈顶函数并计数"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self.total_samples = 0
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.total_samples = 0
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while self._running:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    code = frame.f_code
+                    key = (names.get(thread_id, str(thread_id)),
+                           f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    self.samples[key] += 1
+                    self.total_samples += 1
+            time.sleep(self.interval)
+
+    def report(self, top=20):
+        """返回采样最多的函数列表 [(线程, 函数, 次数, 百分比), ...]"""
+        with self._lock:
+            total = self.total_samples or 1
+            return [(thread, func, count, 100.0 * count / total)
+                    for (thread, func), count in self.samples.most_common(top)]
+
+    def format_report(self, top=20):
+        lines = [f"采样总数: {self.total_samples}"]
+        for thread, func, count, pct in self.report(top):
+            lines.append(f"{pct:5.1f}%  {count:6d}  [{thread}] {func}")
+        return "\n".join(lines)
+
+
+class MetricsServer:
+    """本地 HTTP 服务: /metrics (Prometheus 文本), /metrics.json, /profile"""
+
+    def __init__(self, metrics, profiler=None, host="127.0.0.1", port=9100):
+        self.metrics = metrics
+        self.profiler = profiler
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        """启动服务，端口被占用时抛出 OSError"""
+        metrics = self.metrics
+        profiler = self.profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = metrics.render_prometheus()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(metrics.snapshot(), ensure_ascii=False)
+                    content_type = "application/json"
+                elif self.path == "/profile" and profiler is not None:
+                    body = profiler.format_report(50)
+                    content_type = "text/plain"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                # 不向控制台输出访问日志
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
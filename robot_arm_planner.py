@@ -0,0 +1,193 @@
+"""
+ISDN 2601 机械臂 抓取规划模块
+根据物品类型、抓取姿态和放置姿态生成 接近→抓取→抬起→搬运→释放 轨迹
+规划结果按量化后的 起点/抓取/放置 姿态缓存到 JSON 文件，重复任务直接读取
+姿态均为关节角 (servo1 腕部, servo2 底座, servo3 肩部, servo4 肘部, servo5 夹爪)
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+# 规划结束时的待机姿态: 关节角同固件 reset，夹爪与预设动作结束时一样保持张开
+# (固件 reset 会把夹爪关到 90°)
+HOME_POSE = (90, 45, 100, 0, 30)
+
+GRIPPER_OPEN = 30
+
+# 抓取模板 (偏移量顺序同姿态，夹爪一项不使用)
+#   approach_offset: 接近点相对抓取姿态的偏移 (在物品上方)
+#   lift_offset:     夹住后抬起的偏移，放置时也用作放置点上方的过渡点
+#   close_angle:     夹紧角度
+#   speed:           关节最大速度 (°/s)
+#   grip_time:       夹爪开合等待时间 (秒)
+GraspTemplate = namedtuple('GraspTemplate',
+                           ['approach_offset', 'lift_offset', 'close_angle', 'speed', 'grip_time'])
+
+# 数值来自 PRESET_ACTIONS.cpp 中手工调好的动作序列
+GRASP_TEMPLATES = {
+    'cube': GraspTemplate((40, 0, 0, 0), (0, 0, 20, 0), 90, 120.0, 0.5),
+    'cylinder': GraspTemplate((-10, 0, 15, 0), (-50, 0, 35, 0), 75, 120.0, 0.5),
+    'hat': GraspTemplate((20, 0, 10, 0), (0, 0, 20, 0), 90, 100.0, 0.5),
+    'boat': GraspTemplate((15, 0, 5, 0), (-40, 0, 15, 0), 70, 80.0, 0.6),
+}
+
+# 模板或规划算法修改后递增，使旧缓存失效
+PLANNER_VERSION = 1
+
+MIN_SEGMENT_TIME = 0.2
+
+
+def _clip(angle):
+    return max(0, min(180, int(round(angle))))
+
+
+def _offset(pose, offset, gripper):
+    """在姿态上加偏移并设置夹爪角度"""
+    return tuple(_clip(a + d) for a, d in zip(pose[:4], offset)) + (gripper,)
+
+
+def quantize(pose, quantum):
+    """把姿态量化到 quantum 度的网格"""
+    return tuple(_clip(round(a / quantum) * quantum) for a in pose)
+
+
+class PlanCache:
+    """持久化规划缓存 (JSON 文件)
+    最多保留 max_entries 条 (最近最少使用的先淘汰)；每条新规划都立即写入文件，
+    程序崩溃也不会丢失已算出的规划 (命中只调整内存中的淘汰顺序，随下一次写入保存)"""
+
+    def __init__(self, path, max_entries=200):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.plans = OrderedDict()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == PLANNER_VERSION:
+            # 文件中按使用先后排列，最后的最近使用
+            self.plans = OrderedDict(data.get('plans', {}))
+            self._evict()
+
+    def save(self):
+        """写入临时文件后替换，避免中途退出损坏缓存"""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': PLANNER_VERSION, 'plans': self.plans}, f)
+            os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        with self._lock:
+            plan = self.plans.get(key)
+            if plan is not None:
+                self.plans.move_to_end(key)
+            return plan
+
+    def put(self, key, plan):
+        with self._lock:
+            self.plans[key] = plan
+            self.plans.move_to_end(key)
+            self._evict()
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self.plans = OrderedDict()
+        self.save()
+
+    def _evict(self):
+        while len(self.plans) > self.max_entries:
+            self.plans.popitem(last=False)
+
+    def __len__(self):
+        return len(self.plans)
+
+
+class PickPlacePlanner:
+    """抓取-放置规划器"""
+
+    def __init__(self, cache_path, quantum=5):
+        self.quantum = quantum
+        self.cache = PlanCache(cache_path)
+
+    def cache_key(self, object_type, start, pick, place):
+        start, pick, place = (quantize(p, self.quantum) for p in (start, pick, place))
+        return f"{object_type}|{start}|{pick}|{place}"
+
+    def plan(self, object_type, start, pick, place):
+        """返回 (plan, cached)
+        plan = {'object', 'times': [...], 'positions': [[5个角度], ...],
+                'phases': [{'name', 'start', 'end'}, ...]}"""
+        if object_type not in GRASP_TEMPLATES:
+            raise ValueError(f"未知物品类型: {object_type}")
+
+        key = self.cache_key(object_type, start, pick, place)
+        plan = self.cache.get(key)
+        if plan is not None:
+            return plan, True
+
+        # 用量化后的姿态规划，保证同一个缓存键对应唯一结果
+        start, pick, place = (quantize(p, self.quantum) for p in (start, pick, place))
+        plan = build_plan(object_type, start, pick, place)
+        self.cache.put(key, plan)
+        return plan, False
+
+
+def build_plan(object_type, start, pick, place):
+    """根据模板生成分阶段的关节轨迹"""
+    template = GRASP_TEMPLATES[object_type]
+    close = template.close_angle
+
+    pre_grasp = _offset(pick, template.approach_offset, GRIPPER_OPEN)
+    grasp_open = _offset(pick, (0, 0, 0, 0), GRIPPER_OPEN)
+    grasp_closed = _offset(pick, (0, 0, 0, 0), close)
+    lifted = _offset(pick, template.lift_offset, close)
+    pre_place = _offset(place, template.lift_offset, close)
+    placed = _offset(place, (0, 0, 0, 0), close)
+    released = _offset(place, (0, 0, 0, 0), GRIPPER_OPEN)
+    retreat = _offset(place, template.lift_offset, GRIPPER_OPEN)
+    start_open = tuple(start[:4]) + (GRIPPER_OPEN,)
+
+    phases = [
+        ('approach', [start_open, pre_grasp]),
+        ('grasp', [grasp_open, grasp_closed]),
+        ('lift', [lifted]),
+        ('transfer', [pre_place, placed]),
+        ('release', [released, retreat, HOME_POSE]),
+    ]
+
+    times = [0.0]
+    positions = [tuple(start)]
+    phase_info = []
+    for name, waypoints in phases:
+        phase_start = times[-1]
+        for pose in waypoints:
+            times.append(round(times[-1] + _segment_time(positions[-1], pose, template), 3))
+            positions.append(pose)
+        phase_info.append({'name': name, 'start': phase_start, 'end': times[-1]})
+
+    return {
+        'object': object_type,
+        'times': times,
+        'positions': [list(p) for p in positions],
+        'phases': phase_info,
+    }
+
+
+def _segment_time(a, b, template):
+    """两个姿态之间的运动时间: 关节按模板速度移动，夹爪开合固定等待"""
+    joint_delta = max(abs(x - y) for x, y in zip(a[:4], b[:4]))
+    duration = joint_delta / template.speed
+    if a[4] != b[4]:
+        duration = max(duration, template.grip_time)
+    return max(duration, MIN_SEGMENT_TIME)
@@ -0,0 +1,80 @@
+"""
+ISDN 2601 机械臂 限流运动调度
+与固件 POWER_SCHEDULER.cpp 使用相同的电流模型和排程算法:
+按每个舵机运动时的估计电流和电流预算安排启动时间，预算允许时并行，否则错开，
+在不超预算的前提下尽量缩短总时间 (最长关节优先的贪心排程)
+"""
+
+# 运动时估计电流 (mA)，顺序 servo1..servo5: 腕部, 底座, 肩部, 肘部, 夹爪
+SERVO_MOVING_MA = (200, 250, 350, 300, 150)
+# 静止保持电流 (mA)
+SERVO_IDLE_MA = 10
+# 带负载时 SG90 速度估计 (°/s) 与到位余量 (秒)
+SERVO_SPEED_DPS = 400.0
+SERVO_SETTLE = 0.02
+
+DEFAULT_POWER_BUDGET_MA = 800
+
+
+def move_duration(delta):
+    """单个舵机转动 delta 度的估计时间 (秒)"""
+    return 0.0 if delta == 0 else abs(delta) / SERVO_SPEED_DPS + SERVO_SETTLE
+
+
+def _load_at(t, schedule):
+    """t 时刻正在运动的舵机额外电流之和"""
+    return sum(SERVO_MOVING_MA[j] - SERVO_IDLE_MA
+               for j, (start, duration) in schedule.items() if start <= t < start + duration)
+
+
+def _peak_load(start, end, schedule):
+    """[start, end) 内的峰值电流；电流只在有舵机启动时上升，检查这些时刻即可"""
+    probes = [start] + [s for s, _ in schedule.values() if start < s < end]
+    return max(_load_at(t, schedule) for t in probes)
+
+
+def schedule_move(start_pose, target_pose, budget_ma=DEFAULT_POWER_BUDGET_MA):
+    """计算每个舵机的启动时间
+    返回 (starts, total)，starts[i] 为 servo(i+1) 的启动时间 (秒)，total 为全部到位的时间；
+    budget_ma 为 0 表示不限流"""
+    durations = [move_duration(b - a) for a, b in zip(start_pose, target_pose)]
+    starts = [0.0] * len(durations)
+    schedule = {}  # joint -> (start, duration)
+    baseline = len(durations) * SERVO_IDLE_MA
+    total = 0.0
+
+    # 最长关节优先
+    for joint in sorted(range(len(durations)), key=lambda i: -durations[i]):
+        duration = durations[joint]
+        if duration == 0:
+            continue
+        extra = SERVO_MOVING_MA[joint] - SERVO_IDLE_MA
+
+        if budget_ma == 0:
+            best = 0.0
+        else:
+            # 候选启动时刻: 立即，或某个已排程舵机到位时；排在所有舵机之后总是可行
+            best = total
+            candidates = [0.0] + [s + d for s, d in schedule.values()]
+            for t in sorted(candidates):
+                if t >= best:
+                    break
+                if baseline + _peak_load(t, t + duration, schedule) + extra <= budget_ma:
+                    best = t
+                    break
+
+        starts[joint] = best
+        schedule[joint] = (best, duration)
+        total = max(total, best + duration)
+
+    return starts, total
+
+
+def peak_current(start_pose, target_pose, starts):
+    """按排程估计的峰值总电流 (mA)，用于检查或显示"""
+    schedule = {i: (starts[i], move_duration(b - a))
+                for i, (a, b) in enumerate(zip(start_pose, target_pose)) if a != b}
+    baseline = len(starts) * SERVO_IDLE_MA
+    if not schedule:
+        return baseline
+    return baseline + max(_load_at(s, schedule) for s, _ in schedule.values())
@@ -0,0 +1,214 @@
+"""
+ISDN 2601 机械臂 模拟器
+在本机模拟固件的 WiFi UDP 指令通道，用于无硬件时测试 GUI 和传输基准
+    python robot_arm_simulator.py --port 4210 --loss 0.05
+GUI 中端口填写 udp://127.0.0.1:4210 即可连接
+"""
+
+import argparse
+import random
+import socket
+import time
+from collections import deque
+
+INIT_POSE = [90, 45, 100, 0, 90]
+SEQ_WINDOW = 32  # 与固件一致: 记住最近多少个序号是否已执行
+SERVO_NAMES = ("Wrist", "Base", "Shoulder", "Elbow", "Gripper")
+READ_ONLY_COMMANDS = ("ping", "stats", "status", "qstatus", "power", "help")
+
+# 与 MOTION_QUEUE.h 一致
+MOTION_QUEUE_SIZE = 16
+MOTION_DEFAULT_SPEED = 300  # 未指定时长时的速度 (度/秒)
+MOTION_MIN_DURATION = 20  # 毫秒
+
+
+class ArmSimulator:
+    """按固件的命令集更新5个舵机角度"""
+
+    def __init__(self):
+        self.positions = list(INIT_POSE)
+        self.power_budget = 800
+        self.queue = deque()  # 运动队列 [(角度, 时长ms), ...]
+        self.segment = None  # 正在执行的段 (开始时间, 时长秒, 目标角度)
+        self.queue_blend = 0
+        self.commands = 0
+        self.exec_times = []
+        self.start_time = time.time()
+
+    def execute(self, command):
+        """执行一条命令，返回与固件相同的输出文本 (None 表示没有输出，只回复 ok)
+        move/reset/夹爪开合与固件一样阻塞 0.5 秒"""
+        start = time.perf_counter()
+        self.commands += 1
+        parts = command.strip().lower().split()
+        reply = None
+
+        if not parts:
+            return None
+        self.service_queue()
+        if parts[0] == "ping":
+            reply = "pong"
+        elif parts[0] == "stats":
+            reply = self.stats_line()
+        elif parts[0] == "status":
+            reply = "\n".join(f"  Servo{i + 1} ({name}): {angle}°"
+                              for i, (name, angle) in enumerate(zip(SERVO_NAMES, self.positions)))
+        elif parts[0] == "power":
+            if len(parts) == 2:
+                self.power_budget = max(0, int(parts[1]))
+            reply = f"Power budget: {self.power_budget} mA"
+        elif parts[0] == "set" and len(parts) == 3:
+            servo, angle = int(parts[1]), int(parts[2])
+            if not 1 <= servo <= 5:
+                reply = "Error: Servo number must be 1-5"
+            elif not 0 <= angle <= 180:
+                reply = "Error: Angle must be 0-180"
+            else:
+                self.positions[servo - 1] = angle
+                reply = f"Servo{servo} -> {angle}°"
+        elif parts[0] in ("move", "pose") and len(parts) == 6:
+            self.positions = [max(0, min(180, int(a))) for a in parts[1:]]
+            if parts[0] == "move":
+                time.sleep(0.5)
+                reply = "Moving all servos...\nPositions: " + ", ".join(map(str, self.positions))
+        elif parts[0] == "queue" and len(parts) in (6, 7):
+            values = [int(v) for v in parts[1:]]
+            rejected = len(self.queue) >= MOTION_QUEUE_SIZE
+            if not rejected:
+                angles = [max(0, min(180, a)) for a in values[:5]]
+                self.queue.append((angles, values[5] if len(values) == 6 and values[5] > 0 else 0))
+                self.service_queue()
+            reply = self.queue_status(rejected)
+        elif parts[0] == "queue":
+            reply = "Error: Use 'queue <a1> <a2> <a3> <a4> <a5> [ms]'"
+        elif parts[0] == "qstatus":
+            reply = self.queue_status()
+        elif parts[0] == "qclear":
+            self.queue.clear()
+            self.segment = None
+            reply = self.queue_status()
+        elif parts[0] == "qblend" and len(parts) == 2:
+            self.queue_blend = max(0, int(parts[1]))
+            reply = self.queue_status()
+        elif parts[0] in ("reset", "r"):
+            self.positions = list(INIT_POSE)
+            time.sleep(0.5)
+            reply = "Resetting to init position...\nReset complete!"
+        elif parts[0] in ("open", "["):
+            self.positions[4] = 30
+            time.sleep(0.5)
+            reply = "Opening gripper...\nGripper opened!"
+        elif parts[0] in ("close", "]"):
+            self.positions[4] = 90
+            time.sleep(0.5)
+            reply = "Closing gripper...\nGripper closed!"
+        else:
+            reply = "Unknown command. Type 'help' for command list."
+
+        self.exec_times.append(int((time.perf_counter() - start) * 1e6))
+        return reply
+
+    def service_queue(self):
+        """按时间推进运动队列 (与固件 serviceMotionQueue 相同的时长和拐角平滑规则)，
+        模拟器只在段结束时更新角度，不做插值"""
+        now = time.perf_counter()
+        while True:
+            if self.segment is not None:
+                start, duration, target = self.segment
+                blend = min(self.queue_blend / 1000, duration / 2) if self.queue else 0
+                if now - start < duration - blend:
+                    return
+                self.positions = list(target)
+                self.segment = None
+                next_start = start + duration - blend
+            else:
+                next_start = now
+            if not self.queue:
+                return
+            angles, duration_ms = self.queue.popleft()
+            if duration_ms == 0:
+                max_delta = max(abs(a - b) for a, b in zip(angles, self.positions))
+                duration_ms = max_delta * 1000 / MOTION_DEFAULT_SPEED
+            self.segment = (next_start, max(duration_ms, MOTION_MIN_DURATION) / 1000, angles)
+
+    def queue_status(self, rejected=False):
+        """与固件 printQueueStatus 格式相同"""
+        return (f"Q {'full ' if rejected else ''}depth={len(self.queue)} "
+                f"free={MOTION_QUEUE_SIZE - len(self.queue)} "
+                f"active={int(self.segment is not None)} blend={self.queue_blend}")
+
+    def stats_line(self):
+        """与固件 stats 命令格式相同"""
+        times = self.exec_times or [0]
+        exec_us = f"{min(times)}/{sum(times) // len(times)}/{max(times)}"
+        uptime_ms = int((time.time() - self.start_time) * 1000)
+        return (f"STATS loop_us=0/0/0 parse_us=0/0/0 exec_us={exec_us} "
+                f"last_exec_us={times[-1]} loops=0 cmds={self.commands} "
+                f"rx_overflow=0 rx_hw_overrun=0 heap=0 uptime_ms={uptime_ms}")
+
+
+def serve(host="127.0.0.1", port=4210, loss=0.0):
+    """UDP 服务循环，loss 为模拟的收/发丢包率"""
+    sim = ArmSimulator()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    last_remote = None
+    last_seq = 0
+    executed_mask = 0  # bit i: 序号 last_seq - i 已执行
+    print(f"模拟器监听 udp://{host}:{port} (丢包率 {loss:.0%})")
+
+    while True:
+        data, remote = sock.recvfrom(512)
+        if random.random() < loss:
+            continue  # 模拟接收丢包
+
+        seq_text, _, command = data.decode('utf-8', errors='ignore').strip().partition(' ')
+        try:
+            seq = int(seq_text)
+        except ValueError:
+            continue
+
+        # 与固件一致: 新上位机重新计数；窗口内已执行的序号不重复执行 (只读命令重新回复)，
+        # 丢包后重发的未执行序号照常执行，超出窗口的旧序号回复错误
+        if remote != last_remote:
+            last_remote = remote
+            last_seq = 0
+            executed_mask = 0
+        if seq > last_seq:
+            shift = seq - last_seq
+            executed_mask = ((executed_mask << shift) | 1) & ((1 << SEQ_WINDOW) - 1) \
+                if shift < SEQ_WINDOW else 1
+            last_seq = seq
+            duplicate = False
+        elif last_seq - seq >= SEQ_WINDOW:
+            if random.random() >= loss:
+                sock.sendto(f"{seq} error stale".encode('utf-8'), remote)
+            continue
+        else:
+            bit = 1 << (last_seq - seq)
+            duplicate = bool(executed_mask & bit)
+            executed_mask |= bit
+
+        if duplicate and command not in READ_ONLY_COMMANDS:
+            reply = "ok"
+        else:
+            reply = sim.execute(command) or "ok"
+
+        if random.random() >= loss:
+            sock.sendto(f"{seq} {reply}".encode('utf-8'), remote)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="机械臂 UDP 模拟器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4210)
+    parser.add_argument("--loss", type=float, default=0.0, help="模拟丢包率 (0-1)")
+    args = parser.parse_args()
+    try:
+        serve(args.host, args.port, args.loss)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+ISDN 2601 机械臂 状态模型
+GUI 中舵机角度的唯一来源: 所有修改都经过 update()，只有真正变化的舵机会通知监听者，
+并附带来源 (用户操作 / 程序更新)，界面据此只重绘变化的控件、且不对程序更新回发指令
+"""
+
+import threading
+
+SERVO_KEYS = ('servo1', 'servo2', 'servo3', 'servo4', 'servo5')
+
+# 与固件 reset 命令一致的初始姿态
+RESET_POSE = {'servo1': 90, 'servo2': 45, 'servo3': 100, 'servo4': 0, 'servo5': 90}
+
+# 变化来源
+SOURCE_USER = 'user'        # 滑块拖动、按钮、键盘、手柄 (需要发送指令)
+SOURCE_PROGRAM = 'program'  # 路径回放、串口回读、重置 (指令已发送或无需发送)
+
+
+class ArmState:
+    """带变化检测的舵机角度模型 (线程安全)"""
+
+    def __init__(self, initial):
+        self._lock = threading.Lock()
+        self._angles = {key: int(initial[key]) for key in SERVO_KEYS}
+        self._listeners = []
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._angles[key]
+
+    def snapshot(self):
+        """当前角度的字典副本"""
+        with self._lock:
+            return dict(self._angles)
+
+    def pose(self):
+        """当前姿态 (servo1..servo5)"""
+        with self._lock:
+            return tuple(self._angles[key] for key in SERVO_KEYS)
+
+    def subscribe(self, callback):
+        """注册监听: callback(changed, source)，changed 为 {key: 新角度}"""
+        self._listeners.append(callback)
+
+    def update(self, changes, source=SOURCE_PROGRAM):
+        """应用修改，返回实际变化的舵机 {key: 新角度}；没有变化时不通知"""
+        changed = {}
+        with self._lock:
+            for key, angle in changes.items():
+                angle = max(0, min(180, int(angle)))
+                if self._angles[key] != angle:
+                    self._angles[key] = angle
+                    changed[key] = angle
+        if changed:
+            for callback in self._listeners:
+                callback(changed, source)
+        return changed
+
+    def update_pose(self, pose, source=SOURCE_PROGRAM):
+        """按 servo1..servo5 顺序更新整个姿态"""
+        return self.update(dict(zip(SERVO_KEYS, pose)), source)
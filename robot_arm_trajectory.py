@@ -0,0 +1,96 @@
+"""
+ISDN 2601 机械臂 轨迹处理模块
+连续示教录制的时间缩放、空闲段裁剪和定频重采样 (numpy 向量化实现)
+轨迹格式: times 形状 (N,) 单位秒，positions 形状 (N, 5) 顺序为 servo1..servo5
+"""
+
+import numpy as np
+
+# SG90 空载速度约 0.1s/60° (4.8V)，即 600°/s
+SERVO_MAX_SPEED = 600.0
+
+
+def as_trajectory(times, positions):
+    """转换为 numpy 数组并检查形状"""
+    times = np.asarray(times, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if positions.ndim != 2 or len(times) != len(positions):
+        raise ValueError("times 与 positions 长度不一致")
+    return times, positions
+
+
+def trim_idle(times, positions, threshold=0.5, max_idle=0.3):
+    """裁剪空闲段
+    相邻两个采样点所有舵机变化都小于 threshold 度视为空闲；
+    开头和结尾的空闲段完全去掉，中间每段空闲最多保留 max_idle 秒"""
+    times, positions = as_trajectory(times, positions)
+    if len(times) < 2:
+        return times - (times[0] if len(times) else 0), positions
+
+    dt = np.diff(times)
+    moving = np.any(np.abs(np.diff(positions, axis=0)) >= threshold, axis=1)
+    if not moving.any():
+        return np.zeros(1), positions[:1]
+
+    # 相邻的空闲区间编为同一段: 每遇到一个运动区间段号加一
+    run_id = np.cumsum(moving)
+    idle_total = np.bincount(run_id, weights=np.where(moving, 0.0, dt))
+    scale = np.minimum(1.0, max_idle / np.maximum(idle_total, 1e-9))
+    scale[0] = 0.0                                # 开头空闲
+    if not moving[-1]:
+        scale[run_id[-1]] = 0.0                   # 结尾空闲
+    new_dt = np.where(moving, dt, dt * scale[run_id])
+
+    keep = np.concatenate(([True], new_dt > 0))
+    new_times = np.concatenate(([0.0], np.cumsum(new_dt)))
+    return new_times[keep], positions[keep]
+
+
+def time_scale(times, speed):
+    """按速度倍数缩放时间 (speed=2 表示两倍速)"""
+    if speed <= 0:
+        raise ValueError("speed 必须大于 0")
+    return np.asarray(times, dtype=float) / speed
+
+
+def max_speed_scale(times, positions, max_speed=SERVO_MAX_SPEED):
+    """在不超过舵机最大角速度的前提下可使用的最大回放倍速"""
+    times, positions = as_trajectory(times, positions)
+    if len(times) < 2:
+        return 1.0
+    dt = np.diff(times)
+    delta = np.abs(np.diff(positions, axis=0)).max(axis=1)
+    valid = dt > 0
+    if not valid.any():
+        return 1.0
+    peak = (delta[valid] / dt[valid]).max()
+    return max_speed / peak if peak > 0 else 1.0
+
+
+def resample(times, positions, rate):
+    """线性插值重采样到固定频率 rate (Hz)，返回整数角度"""
+    times, positions = as_trajectory(times, positions)
+    if len(times) < 2 or times[-1] <= times[0]:
+        return times[:1] - times[:1], np.rint(positions[:1]).astype(int)
+
+    new_times = np.arange(times[0], times[-1], 1.0 / rate)
+    new_times = np.append(new_times, times[-1])
+
+    idx = np.clip(np.searchsorted(times, new_times, side='right') - 1, 0, len(times) - 2)
+    span = times[idx + 1] - times[idx]
+    frac = np.divide(new_times - times[idx], span, out=np.zeros_like(span), where=span > 0)
+    new_positions = positions[idx] + frac[:, None] * (positions[idx + 1] - positions[idx])
+    return new_times - times[0], np.rint(new_positions).astype(int)
+
+
+def prepare_playback(times, positions, speed=1.0, rate=25.0, max_speed=SERVO_MAX_SPEED, trim=True):
+    """生成回放用的定频轨迹
+    speed 为 None 时使用舵机允许的最快倍速；规划生成的轨迹包含有意的等待，传 trim=False"""
+    if trim:
+        times, positions = trim_idle(times, positions)
+    else:
+        times, positions = as_trajectory(times, positions)
+    if speed is None:
+        speed = max_speed_scale(times, positions, max_speed)
+    times = time_scale(times, speed)
+    return resample(times, positions, rate)
@@ -0,0 +1,334 @@
+"""
+ISDN 2601 机械臂 WiFi UDP 传输
+UdpTransport 实现了 GUI 用到的 pyserial 接口 (write / readline / in_waiting / is_open / close)，
+可以直接替换 serial.Serial。每条指令带序号，超时未确认则重发，超过重试次数计为丢包。
+固件执行完命令后把输出作为回复发回 (可能有多行)，readline 逐行返回，与串口一致。
+连续多条指令丢失时 write / readline 抛出 OSError，与串口断开时一样触发 GUI 的自动重连。
+
+基准测试 (对比串口与 UDP 的延迟和吞吐):
+    python robot_arm_transport.py udp://127.0.0.1:4210
+    python robot_arm_transport.py COM6
+"""
+
+import argparse
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+DEFAULT_UDP_PORT = 4210
+UDP_RECV_SIZE = 2048
+SEQ_WINDOW = 32  # 固件只记得最近 32 个序号，未确认的指令不能超出这个范围
+MAX_CONSECUTIVE_LOSSES = 5  # 连续丢失这么多条指令 (期间没有任何回复) 视为连接中断
+
+# 固件中会阻塞的命令的执行时间估计 (秒): 回复在执行完后才发出，确认超时相应延长
+# move/reset 按限流调度最坏情况估计，预设动作为 PRESET_ACTIONS.cpp 中 delay 之和
+BLOCKING_SECONDS = {
+    'move': 2.5, 'reset': 2.5, 'r': 2.5,
+    'open': 0.5, 'close': 0.5, '[': 0.5, ']': 0.5,
+    'cube': 6.6, 'cylinder': 7.2, 'hat': 6.8, 'boat': 7.3,
+}
+
+
+def open_transport(port, timeout=0.1, **udp_options):
+    """根据端口名打开串口或 UDP 连接 (udp://host:port)
+    udp_options (如 metrics / ui_thread) 只用于 UDP 连接，见 UdpTransport"""
+    if port.startswith("udp://"):
+        return UdpTransport.from_url(port, timeout=timeout, **udp_options)
+    import serial
+    return serial.Serial(port, 115200, timeout=timeout)
+
+
+class UdpTransport:
+    """带序号、确认和重发的 UDP 指令通道
+    metrics: robot_arm_metrics.Metrics，发送/重发/丢包等计数同时写入其中
+    ui_thread: 界面线程，从它写入时序号窗口已满不等待，直接丢弃指令 (计入 dropped)"""
+
+    def __init__(self, host, port=DEFAULT_UDP_PORT, timeout=0.1, ack_timeout=0.05, retries=3,
+                 max_losses=MAX_CONSECUTIVE_LOSSES, metrics=None, ui_thread=None):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self.max_losses = max_losses
+        self.metrics = metrics
+        self.ui_thread = ui_thread
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect(self.address)
+        self.sock.settimeout(0.01)
+
+        self._lock = threading.Lock()
+        self._lines_ready = threading.Condition(self._lock)
+        self._window_open = threading.Condition(self._lock)
+        self._lines = deque()
+        self._pending = {}  # seq -> [payload, sent_at, tries, is_pose, superseded, expected_at]
+        self._seq = 0
+        self._busy_until = 0.0  # 固件预计执行完已发送的阻塞命令的时间
+        self._consecutive_losses = 0  # 收到任何回复都清零
+        self._last_reply = time.perf_counter()
+        self.is_open = True
+
+        # 统计
+        self.sent = 0
+        self.acked = 0
+        self.retransmits = 0
+        self.lost = 0
+        self.superseded = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.rtts = deque(maxlen=1000)
+
+        self._thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        parsed = urlparse(url)
+        return cls(parsed.hostname, parsed.port or DEFAULT_UDP_PORT, **kwargs)
+
+    @property
+    def in_waiting(self):
+        with self._lock:
+            if not self._lines:
+                self._check_link()
+            return len(self._lines)
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    @property
+    def link_lost(self):
+        return self._consecutive_losses >= self.max_losses
+
+    def _check_link(self):
+        if not self.is_open:
+            raise OSError("UDP transport is closed")
+        if self.link_lost:
+            raise OSError(f"UDP link lost: {self._consecutive_losses} commands unanswered")
+
+    def _count(self, name, value=1):
+        if self.metrics is not None:
+            self.metrics.inc(name, value)
+
+    def write(self, data):
+        """发送一条或多条以换行结尾的指令"""
+        self._check_link()
+        for line in data.decode('utf-8').splitlines():
+            line = line.strip()
+            if line:
+                self._send_command(line)
+        return len(data)
+
+    def _send_command(self, command):
+        is_pose = command.startswith("pose ")
+        blocking = BLOCKING_SECONDS.get(command.split(' ', 1)[0], 0.0)
+        with self._lock:
+            if is_pose:
+                # 新的 pose 覆盖尚未确认的旧 pose，旧包不再重发
+                for entry in self._pending.values():
+                    entry[4] = entry[4] or entry[3]
+            # 最早的需要重发的指令超出固件序号窗口时等待 (类似串口发送缓冲区满)，
+            # 否则它的重发会被固件当作过期包拒绝；被覆盖的 pose 不再重发，不占窗口。
+            # 界面线程 (如滑块回调) 不等待，直接丢弃这条指令，避免界面卡住
+            from_ui = threading.current_thread() is self.ui_thread
+            window_open = self._window_open.wait_for(
+                lambda: (self.link_lost or
+                         self._seq + 1 - self._oldest_retransmittable() < SEQ_WINDOW),
+                timeout=0 if from_ui else self.ack_timeout * (self.retries + 1) * self.retries)
+            if self.link_lost:
+                raise OSError(f"UDP link lost: {self._consecutive_losses} commands unanswered")
+            if not window_open and from_ui:
+                self.dropped += 1
+                self._count("udp_commands_dropped_total")
+                if not is_pose:
+                    self._lines.append(f"Error: UDP window full, dropped '{command}'")
+                    self._lines_ready.notify()
+                return
+            self._seq += 1
+            payload = f"{self._seq} {command}".encode('utf-8')
+            # 固件逐条执行: 排在阻塞命令之后的指令 (包括之前丢包的重发) 要等它执行完才有回复
+            now = time.perf_counter()
+            expected_at = max(now, self._busy_until) + blocking
+            if blocking:
+                self._busy_until = expected_at
+                for entry in self._pending.values():
+                    entry[5] = max(entry[5], expected_at)
+            self._pending[self._seq] = [payload, now, 1, is_pose, False, expected_at]
+            self.sent += 1
+            self._count("udp_packets_sent_total")
+        self.sock.send(payload)
+
+    def _oldest_retransmittable(self):
+        return min((seq for seq, entry in self._pending.items() if not entry[4]),
+                   default=self._seq + 1)
+
+    def readline(self):
+        """返回一行回复 (bytes)，超时返回 b"" """
+        with self._lines_ready:
+            if not self._lines:
+                self._lines_ready.wait(self.timeout)
+            if not self._lines:
+                self._check_link()
+                return b""
+            return self._lines.popleft().encode('utf-8') + b"\n"
+
+    def _receive_loop(self):
+        while self.is_open:
+            try:
+                data = self.sock.recv(UDP_RECV_SIZE)
+            except socket.timeout:
+                data = None
+            except OSError:
+                # ICMP 端口不可达等错误: 继续等待，由重发和丢包计数处理
+                data = None
+                if not self.is_open:
+                    break
+
+            if data:
+                self._handle_reply(data.decode('utf-8', errors='ignore').strip())
+            self._retransmit_expired()
+
+    def _handle_reply(self, text):
+        seq_text, _, body = text.partition(' ')
+        try:
+            seq = int(seq_text)
+        except ValueError:
+            return
+        with self._lock:
+            self._consecutive_losses = 0
+            self._last_reply = time.perf_counter()
+            entry = self._pending.pop(seq, None)
+            if entry is None:
+                return  # 重发产生的重复回复
+            self._window_open.notify_all()
+            if body.startswith("error "):
+                # 固件没有执行 (序号太旧无法判断是否执行过 / 数据包过长)
+                self.rejected += 1
+                self._count("udp_packets_rejected_total")
+                self._lines.append(f"Error: UDP packet {seq} rejected ({body[6:]})")
+                self._lines_ready.notify()
+                return
+            self.acked += 1
+            self.rtts.append(time.perf_counter() - entry[1])
+            self._count("udp_packets_acked_total")
+            if body != "ok":
+                lines = [line.strip() for line in body.splitlines() if line.strip()]
+                self._lines.extend(lines)
+                if lines:
+                    self._lines_ready.notify()
+
+    def _retransmit_expired(self):
+        now = time.perf_counter()
+        resend = []
+        with self._lock:
+            for seq, entry in list(self._pending.items()):
+                if now - entry[5] < self.ack_timeout * entry[2]:
+                    continue
+                if entry[4]:
+                    del self._pending[seq]
+                    self.superseded += 1
+                    self._count("udp_packets_superseded_total")
+                    # 连续发送 pose 时 (摇杆) 旧包都被覆盖而不会计为丢包，
+                    # 这期间完全收不到回复同样说明连接中断
+                    if now - self._last_reply > self.ack_timeout * (self.retries + 1):
+                        self._consecutive_losses += 1
+                    self._window_open.notify_all()
+                    continue
+                if entry[2] > self.retries:
+                    del self._pending[seq]
+                    self.lost += 1
+                    self._consecutive_losses += 1
+                    self._count("udp_packets_lost_total")
+                    self._window_open.notify_all()
+                    if self.link_lost:
+                        self._lines_ready.notify_all()
+                    continue
+                entry[2] += 1
+                self.retransmits += 1
+                self._count("udp_retransmits_total")
+                resend.append(entry[0])
+        for payload in resend:
+            try:
+                self.sock.send(payload)
+            except OSError:
+                pass
+
+    def close(self):
+        self.is_open = False
+        self._thread.join(timeout=1.0)
+        self.sock.close()
+
+
+def wait_for_line(link, expected, timeout=2.0):
+    """读取回复直到出现 expected，返回是否收到"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        line = link.readline().decode('utf-8', errors='ignore').strip()
+        if line == expected:
+            return True
+    return False
+
+
+def benchmark(port, pings=50, commands=500):
+    """测量 ping 往返延迟和 pose 指令吞吐量"""
+    link = open_transport(port)
+    try:
+        if not port.startswith("udp://"):
+            # 打开串口会让开发板重启，等待就绪
+            wait_for_line(link, "System ready!", timeout=5.0)
+
+        rtts = []
+        for _ in range(pings):
+            start = time.perf_counter()
+            link.write(b"ping\n")
+            if wait_for_line(link, "pong"):
+                rtts.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(commands):
+            angle = 60 + i % 60
+            link.write(f"pose 90 {angle} 100 0 90\n".encode())
+        link.write(b"ping\n")
+        completed = wait_for_line(link, "pong", timeout=10.0)
+        elapsed = time.perf_counter() - start
+        if isinstance(link, UdpTransport):
+            # 等待剩余的 pose 被确认或判定为覆盖/丢失，统计才完整
+            deadline = time.perf_counter() + 2.0
+            while link.pending and time.perf_counter() < deadline:
+                time.sleep(0.01)
+
+        print(f"传输: {port}")
+        if rtts:
+            print(f"ping 往返: {len(rtts)}/{pings} 成功, "
+                  f"中位数 {statistics.median(rtts) * 1000:.2f} ms, "
+                  f"最大 {max(rtts) * 1000:.2f} ms")
+        else:
+            print("ping 往返: 无回复")
+        if completed:
+            print(f"吞吐量: {commands} 条 pose / {elapsed:.3f} 秒 = {commands / elapsed:.0f} 条/秒")
+        else:
+            print("吞吐量: 超时未完成")
+        if isinstance(link, UdpTransport):
+            print(f"UDP: 发送 {link.sent}, 确认 {link.acked}, 重发 {link.retransmits}, "
+                  f"被覆盖 {link.superseded}, 丢失 {link.lost}, 被拒绝 {link.rejected}, "
+                  f"窗口满丢弃 {link.dropped}")
+    finally:
+        link.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="串口 / UDP 传输基准测试")
+    parser.add_argument("port", help="串口名 (如 COM6) 或 udp://host:port")
+    parser.add_argument("--pings", type=int, default=50)
+    parser.add_argument("--commands", type=int, default=500)
+    args = parser.parse_args()
+    benchmark(args.port, args.pings, args.commands)
+
+
+if __name__ == "__main__":
+    main()
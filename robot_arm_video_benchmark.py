@@ -0,0 +1,179 @@
+"""
+ISDN 2601 机械臂 抓取周期基准 (离线视频分析)
+逐块读取视频帧 (不会把整个视频解码进内存)，用帧差检测运动段，
+输出每个任务的总周期、运动/停顿时间和各运动段时长，作为预设动作和路径回放的基准。
+运动段按时间顺序排列，不标注 接近/抓取/... 等阶段名: 演示视频的运动段无法可靠地对应到
+PRESET_ACTIONS.cpp 的步骤 (夹爪开合等小动作在画面中几乎看不出)，硬套阶段名会得到错误的基准
+
+    python robot_arm_video_benchmark.py videos/*.mp4 --json videos/cycle_baseline.json
+    python robot_arm_video_benchmark.py new-cube.mp4 --compare videos/cycle_baseline.json
+
+依赖: pip install opencv-python numpy
+"""
+
+import argparse
+import json
+import os
+
+import cv2
+import numpy as np
+
+
+def iter_frame_chunks(path, chunk_size=64, width=160):
+    """按块读取视频，返回 (fps, 生成器)；每块为缩小后的灰度帧数组 (n, h, w)"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"无法打开视频: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def chunks():
+        try:
+            height = None
+            buffer = []
+            while True:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                if height is None:
+                    height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                buffer.append(cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA))
+                if len(buffer) == chunk_size:
+                    yield np.stack(buffer)
+                    buffer = []
+            if buffer:
+                yield np.stack(buffer)
+        finally:
+            cap.release()
+
+    return fps, chunks()
+
+
+def motion_energy(chunks):
+    """相邻帧平均绝对差 (每帧一个值)，块与块之间保留上一帧"""
+    energy = []
+    previous = None
+    for chunk in chunks:
+        frames = chunk.astype(np.int16)
+        if previous is not None:
+            frames = np.concatenate((previous[None], frames))
+        if len(frames) > 1:
+            energy.append(np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2)))
+        previous = frames[-1]
+    return np.concatenate(energy) if energy else np.zeros(0)
+
+
+def detect_bursts(energy, fps, smooth=0.25, sensitivity=0.35, min_gap=0.2, min_burst=0.15):
+    """检测运动段，返回 [(开始帧, 结束帧), ...]
+    阈值 = 噪声底 (20分位) + sensitivity × (95分位 - 噪声底)"""
+    if len(energy) == 0:
+        return []
+    window = max(1, int(round(smooth * fps)))
+    smoothed = np.convolve(energy, np.ones(window) / window, mode='same')
+
+    floor, peak = np.percentile(smoothed, [20, 95])
+    moving = smoothed > floor + sensitivity * (peak - floor)
+
+    # 运动段边界: 0→1 为开始，1→0 为结束
+    edges = np.diff(np.concatenate(([0], moving.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    bursts = []
+    for start, end in zip(starts, ends):
+        if bursts and start - bursts[-1][1] < min_gap * fps:
+            bursts[-1] = (bursts[-1][0], end)  # 间隔太短，与上一段合并
+        else:
+            bursts.append((start, end))
+    return [(s, e) for s, e in bursts if e - s >= min_burst * fps]
+
+
+def analyze(path, chunk_size=64, width=160, sensitivity=0.35, speedup=1.0):
+    """分析一个视频，返回结果字典 (时间单位: 秒，已按 speedup 换算为实际时间)
+    segments 中每段为 {'start', 'motion', 'pause'}: 运动时长和到下一段开始前的停顿"""
+    fps, chunks = iter_frame_chunks(path, chunk_size, width)
+    energy = motion_energy(chunks)
+    bursts = detect_bursts(energy, fps, sensitivity=sensitivity)
+
+    to_seconds = speedup / fps
+    result = {
+        'video': os.path.basename(path),
+        'task': os.path.splitext(os.path.basename(path))[0].split('-')[-1],
+        'fps': round(fps, 3),
+        'frames': int(len(energy) + 1),
+        'video_duration': round((len(energy) + 1) * to_seconds, 3),
+        'cycle_time': 0.0,
+        'motion_time': 0.0,
+        'pause_time': 0.0,
+        'segments': [],
+    }
+    if not bursts:
+        return result
+
+    # 周期: 第一段运动开始到最后一段运动结束
+    next_starts = [start for start, _ in bursts[1:]] + [bursts[-1][1]]
+    for (start, end), next_start in zip(bursts, next_starts):
+        result['segments'].append({
+            'start': round(start * to_seconds, 3),
+            'motion': round((end - start) * to_seconds, 3),
+            'pause': round((next_start - end) * to_seconds, 3),
+        })
+    result['cycle_time'] = round((bursts[-1][1] - bursts[0][0]) * to_seconds, 3)
+    result['motion_time'] = round(sum(s['motion'] for s in result['segments']), 3)
+    result['pause_time'] = round(sum(s['pause'] for s in result['segments']), 3)
+    return result
+
+
+def format_table(results, baseline=None):
+    """生成结果表格；给出 baseline 时显示与基准的差值
+    运动段数与基准相同时逐段对比，否则只对比总时间"""
+    header = f"{'task':<10}{'cycle':>8}{'motion':>9}{'pause':>9}{'segments':>10}"
+    lines = [header, "-" * len(header)]
+    reference = {r['task']: r for r in (baseline or [])}
+    for r in results:
+        segments = r['segments']
+        lines.append(f"{r['task']:<10}{r['cycle_time']:>7.2f}s{r['motion_time']:>8.2f}s"
+                     f"{r['pause_time']:>8.2f}s{len(segments):>10}")
+        lines.append("  运动+停顿: " + "  ".join(f"{s['motion']:.2f}+{s['pause']:.2f}" for s in segments))
+        base = reference.get(r['task'])
+        if not base:
+            continue
+        lines.append(f"{'  Δ基准':<9}{r['cycle_time'] - base['cycle_time']:>+7.2f}s"
+                     f"{r['motion_time'] - base['motion_time']:>+8.2f}s"
+                     f"{r['pause_time'] - base['pause_time']:>+8.2f}s"
+                     f"{len(segments) - len(base['segments']):>+10d}")
+        if len(segments) == len(base['segments']):
+            lines.append("  Δ逐段:    " + "  ".join(
+                f"{s['motion'] - b['motion']:+.2f}{s['pause'] - b['pause']:+.2f}"
+                for s, b in zip(segments, base['segments'])))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从演示视频提取抓取周期和各运动段时长")
+    parser.add_argument("videos", nargs="+", help="视频文件")
+    parser.add_argument("--chunk", type=int, default=64, help="每块读取的帧数")
+    parser.add_argument("--width", type=int, default=160, help="分析时缩放到的宽度 (像素)")
+    parser.add_argument("--sensitivity", type=float, default=0.35, help="运动阈值 (0-1，越小越灵敏)")
+    parser.add_argument("--speedup", type=float, default=1.0, help="视频加速倍数 (如 8x 视频填 8)")
+    parser.add_argument("--json", help="把结果保存为 JSON (作为基准)")
+    parser.add_argument("--compare", help="与已保存的基准 JSON 对比")
+    args = parser.parse_args()
+
+    results = [analyze(path, args.chunk, args.width, args.sensitivity, args.speedup)
+               for path in args.videos]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print(format_table(results, baseline))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"\n已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+// 运动队列 (Look-ahead)
+// 上位机可以提前发送多个路径点，固件在 loop 中逐个插值执行，
+// 路径点之间不需要等待串口往返；设置 blend 后在到达拐点前就开始下一段，使拐角平滑
+
+#include <Arduino.h>
+#include <Servo.h>
+#include "MOTION_QUEUE.h"
+
+// 外部声明 (在 main.cpp 中定义)
+extern Servo servo1, servo2, servo3, servo4, servo5;
+extern int pos1, pos2, pos3, pos4, pos5;
+
+struct Waypoint {
+  int angles[5];
+  unsigned long durationMs;  // 0 = use MOTION_DEFAULT_SPEED
+};
+
+Waypoint waypointQueue[MOTION_QUEUE_SIZE];
+int queueHead = 0;   // Next waypoint to execute
+int queueCount = 0;
+
+// Current segment
+bool segmentActive = false;
+int segmentStart[5];
+int segmentTarget[5];
+unsigned long segmentStartMs = 0;
+unsigned long segmentDurationMs = 0;
+unsigned long motionBlendMs = 0;
+unsigned long rejectedWaypoints = 0;  // 队列满被拒绝的路径点数
+
+void writePose(const int angles[5]) {
+  // Only write servos whose angle changed
+  if (angles[0] != pos1) { servo1.write(angles[0]); pos1 = angles[0]; }
+  if (angles[1] != pos2) { servo2.write(angles[1]); pos2 = angles[1]; }
+  if (angles[2] != pos3) { servo3.write(angles[2]); pos3 = angles[2]; }
+  if (angles[3] != pos4) { servo4.write(angles[3]); pos4 = angles[3]; }
+  if (angles[4] != pos5) { servo5.write(angles[4]); pos5 = angles[4]; }
+}
+
+bool enqueueWaypoint(const int angles[5], unsigned long durationMs) {
+  if (queueCount >= MOTION_QUEUE_SIZE) {
+    rejectedWaypoints++;
+    return false;
+  }
+  
+  Waypoint &wp = waypointQueue[(queueHead + queueCount) % MOTION_QUEUE_SIZE];
+  for (int i = 0; i < 5; i++) {
+    wp.angles[i] = constrain(angles[i], 0, 180);
+  }
+  wp.durationMs = durationMs;
+  queueCount++;
+  return true;
+}
+
+void startNextSegment(unsigned long now) {
+  Waypoint &wp = waypointQueue[queueHead];
+  queueHead = (queueHead + 1) % MOTION_QUEUE_SIZE;
+  queueCount--;
+  
+  // Start from wherever the arm is now (mid-segment when blending)
+  segmentStart[0] = pos1;
+  segmentStart[1] = pos2;
+  segmentStart[2] = pos3;
+  segmentStart[3] = pos4;
+  segmentStart[4] = pos5;
+  
+  int maxDelta = 0;
+  for (int i = 0; i < 5; i++) {
+    segmentTarget[i] = wp.angles[i];
+    maxDelta = max(maxDelta, abs(segmentTarget[i] - segmentStart[i]));
+  }
+  
+  segmentDurationMs = wp.durationMs;
+  if (segmentDurationMs == 0) {
+    segmentDurationMs = (unsigned long)maxDelta * 1000UL / MOTION_DEFAULT_SPEED;
+  }
+  segmentDurationMs = max(segmentDurationMs, (unsigned long)MOTION_MIN_DURATION);
+  segmentStartMs = now;
+  segmentActive = true;
+}
+
+void serviceMotionQueue() {
+  unsigned long now = millis();
+  
+  if (segmentActive) {
+    unsigned long elapsed = now - segmentStartMs;
+    
+    if (elapsed >= segmentDurationMs) {
+      writePose(segmentTarget);
+      segmentActive = false;
+    } else {
+      int angles[5];
+      for (int i = 0; i < 5; i++) {
+        angles[i] = segmentStart[i] +
+                    (long)(segmentTarget[i] - segmentStart[i]) * (long)elapsed / (long)segmentDurationMs;
+      }
+      writePose(angles);
+      
+      // Corner blending: hand over to the next segment before reaching this target
+      // 平滑时间不超过本段时长的一半，否则短段一开始就被跳过
+      unsigned long blendMs = min(motionBlendMs, segmentDurationMs / 2);
+      bool blend = queueCount > 0 && blendMs > 0 &&
+                   segmentDurationMs - elapsed <= blendMs;
+      if (!blend) {
+        return;
+      }
+      segmentActive = false;
+    }
+  }
+  
+  if (!segmentActive && queueCount > 0) {
+    startNextSegment(now);
+  }
+}
+
+void clearMotionQueue() {
+  queueHead = 0;
+  queueCount = 0;
+  segmentActive = false;
+}
+
+void setMotionBlend(unsigned long blendMs) {
+  motionBlendMs = blendMs;
+}
+
+bool motionQueueBusy() {
+  return segmentActive || queueCount > 0;
+}
+
+unsigned long motionQueueRejects() {
+  return rejectedWaypoints;
+}
+
+void printQueueStatus(Print &out, bool rejected) {
+  // Format: Q depth=N free=N active=0|1 blend=N
+  //         Q full depth=N ... when the waypoint just sent was rejected
+  out.print(rejected ? "Q full depth=" : "Q depth=");
+  out.print(queueCount);
+  out.print(" free=");
+  out.print(MOTION_QUEUE_SIZE - queueCount);
+  out.print(" active=");
+  out.print(segmentActive ? 1 : 0);
+  out.print(" blend=");
+  out.println(motionBlendMs);
+}
@@ -0,0 +1,21 @@
+#ifndef MOTION_QUEUE_H
+#define MOTION_QUEUE_H
+
+#include <Arduino.h>
+
+// Look-ahead waypoint queue: poses are executed back-to-back in loop()
+// with linear interpolation and optional corner blending.
+
+#define MOTION_QUEUE_SIZE 16
+#define MOTION_DEFAULT_SPEED 300   // Degrees per second when no duration is given
+#define MOTION_MIN_DURATION 20     // Milliseconds
+
+bool enqueueWaypoint(const int angles[5], unsigned long durationMs);
+void serviceMotionQueue();
+void clearMotionQueue();
+void setMotionBlend(unsigned long blendMs);
+bool motionQueueBusy();
+unsigned long motionQueueRejects();
+void printQueueStatus(Print &out, bool rejected = false);
+
+#endif
@@ -0,0 +1,105 @@
+// 限流运动调度
+// 5个SG90同时启动时电流尖峰会导致供电跌落 (抓取失败、舵机抖动)。
+// 按每个舵机的估计电流和电流预算安排启动时间: 预算允许时并行，否则错开，
+// 在不超预算的前提下尽量缩短总时间 (最长关节优先的贪心排程)。
+
+#include <Arduino.h>
+#include "POWER_SCHEDULER.h"
+
+// Estimated current while moving (mA): wrist, base, shoulder, elbow, gripper
+const int SERVO_MOVING_MA[5] = {200, 250, 350, 300, 150};
+// Holding current of an idle servo (mA)
+const int SERVO_IDLE_MA = 10;
+
+int powerBudgetMa = DEFAULT_POWER_BUDGET_MA;
+
+void setPowerBudget(int budgetMa) {
+  powerBudgetMa = max(0, budgetMa);
+}
+
+int getPowerBudget() {
+  return powerBudgetMa;
+}
+
+// Extra current of the scheduled joints that are moving at time t
+int loadAt(unsigned long t, const bool placed[5],
+           const unsigned long startMs[5], const unsigned long durationMs[5]) {
+  int load = 0;
+  for (int j = 0; j < 5; j++) {
+    if (placed[j] && startMs[j] <= t && t < startMs[j] + durationMs[j]) {
+      load += SERVO_MOVING_MA[j] - SERVO_IDLE_MA;
+    }
+  }
+  return load;
+}
+
+// Peak extra current within [start, end). The load only rises when a joint
+// starts, so checking 'start' and every scheduled start inside is enough.
+int peakLoad(unsigned long start, unsigned long end, const bool placed[5],
+             const unsigned long startMs[5], const unsigned long durationMs[5]) {
+  int peak = loadAt(start, placed, startMs, durationMs);
+  for (int j = 0; j < 5; j++) {
+    if (placed[j] && startMs[j] > start && startMs[j] < end) {
+      peak = max(peak, loadAt(startMs[j], placed, startMs, durationMs));
+    }
+  }
+  return peak;
+}
+
+unsigned long schedulePowerAware(const int from[5], const int to[5], unsigned long startMs[5]) {
+  unsigned long durationMs[5];
+  bool placed[5] = {false, false, false, false, false};
+  
+  for (int i = 0; i < 5; i++) {
+    int delta = abs(to[i] - from[i]);
+    durationMs[i] = delta == 0 ? 0 : (unsigned long)delta * 1000UL / SERVO_SPEED_DPS + SERVO_SETTLE_MS;
+    startMs[i] = 0;
+  }
+  
+  int baseline = 5 * SERVO_IDLE_MA;
+  unsigned long total = 0;
+  
+  // Longest move first
+  for (int n = 0; n < 5; n++) {
+    int joint = -1;
+    for (int i = 0; i < 5; i++) {
+      if (!placed[i] && durationMs[i] > 0 && (joint < 0 || durationMs[i] > durationMs[joint])) {
+        joint = i;
+      }
+    }
+    if (joint < 0) {
+      break;
+    }
+    
+    int extra = SERVO_MOVING_MA[joint] - SERVO_IDLE_MA;
+    
+    // Candidate start times: now, or when a scheduled joint finishes
+    unsigned long best = total;  // After everything else always fits
+    if (powerBudgetMa == 0) {
+      best = 0;  // Unlimited budget
+    }
+    for (int c = -1; c < 5 && powerBudgetMa > 0; c++) {
+      unsigned long t;
+      if (c < 0) {
+        t = 0;
+      } else if (placed[c]) {
+        t = startMs[c] + durationMs[c];
+      } else {
+        continue;
+      }
+      if (t >= best) {
+        continue;
+      }
+      int load = peakLoad(t, t + durationMs[joint], placed, startMs, durationMs);
+      if (baseline + load + extra <= powerBudgetMa) {
+        best = t;
+      }
+    }
+    
+    startMs[joint] = best;
+    placed[joint] = true;
+    total = max(total, best + durationMs[joint]);
+  }
+  
+  return total;
+}
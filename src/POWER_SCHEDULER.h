@@ -0,0 +1,18 @@
+#ifndef POWER_SCHEDULER_H
+#define POWER_SCHEDULER_H
+
+// Power-aware multi-joint scheduling: staggers servo start times so the
+// estimated total current never exceeds the configured budget.
+
+#define DEFAULT_POWER_BUDGET_MA 800
+#define SERVO_SPEED_DPS 400     // Loaded SG90 speed estimate (degrees per second)
+#define SERVO_SETTLE_MS 20
+
+void setPowerBudget(int budgetMa);
+int getPowerBudget();
+
+// Computes start offsets (ms) for each servo moving from 'from' to 'to'.
+// Returns the total time until the last servo is expected to arrive.
+unsigned long schedulePowerAware(const int from[5], const int to[5], unsigned long startMs[5]);
+
+#endif
@@ -10,8 +10,8 @@ extern Servo servo1, servo2, servo3, servo4, servo5;
 // ======================
 // 抓取立方体 (Cube)
 // ======================
-void grabCube() {
-  Serial.println("=== Grabbing Cube ===");
+void grabCube(Print &out) {
+  out.println("=== Grabbing Cube ===");
   
   // 1. 打开夹爪
   servo5.write(30);
@@ -59,14 +59,14 @@ void grabCube() {
   delay(500);
   // move 90 45 100 0 30
 
-  Serial.println("=== Cube grabbed successfully! ===\n");
+  out.println("=== Cube grabbed successfully! ===\n");
 }
 
 // ======================
 // 抓取小圆柱 (Small Cylinder)
 // ======================
-void grabCylinder() {
-  Serial.println("=== Grabbing Small Cylinder ===");
+void grabCylinder(Print &out) {
+  out.println("=== Grabbing Small Cylinder ===");
   
   // 打开夹爪
   servo5.write(30);
@@ -117,14 +117,14 @@ void grabCylinder() {
   servo2.write(45);
   delay(500);
   
-  Serial.println("=== Cylinder grabbed successfully! ===\n");
+  out.println("=== Cylinder grabbed successfully! ===\n");
 }
 
 // ======================
 // 抓取小帽子 (Small Hat)
 // ======================
-void grabHat() {
-  Serial.println("=== Grabbing Small Hat ===");
+void grabHat(Print &out) {
+  out.println("=== Grabbing Small Hat ===");
   
   servo5.write(30);
   delay(500);
@@ -173,14 +173,14 @@ void grabHat() {
   servo2.write(45);
   delay(500);
   
-  Serial.println("=== Hat grabbed successfully! ===\n");
+  out.println("=== Hat grabbed successfully! ===\n");
 }
 
 // ======================
 // 抓取小船 (Small Boat)
 // ======================
-void grabBoat() {
-  Serial.println("=== Grabbing Small Boat ===");
+void grabBoat(Print &out) {
+  out.println("=== Grabbing Small Boat ===");
   
   // 船可能是最难的物品
   servo5.write(30);
@@ -226,34 +226,34 @@ void grabBoat() {
   servo2.write(45);
   delay(500);
   
-  Serial.println("=== Boat grabbed successfully! ===\n");
+  out.println("=== Boat grabbed successfully! ===\n");
 }
 
 // ======================
 // 演示所有抓取动作
 // ======================
-void demonstrateAll() {
-  Serial.println("\n========================================");
-  Serial.println("  Full Demonstration - All Items");
-  Serial.println("========================================\n");
+void demonstrateAll(Print &out) {
+  out.println("\n========================================");
+  out.println("  Full Demonstration - All Items");
+  out.println("========================================\n");
   
   delay(2000);
   
-  grabCube();
+  grabCube(out);
   delay(2000);
   
-  grabCylinder();
+  grabCylinder(out);
   delay(2000);
   
-  grabHat();
+  grabHat(out);
   delay(2000);
   
-  grabBoat();
+  grabBoat(out);
   delay(2000);
   
-  Serial.println("========================================");
-  Serial.println("  Demonstration Complete!");
-  Serial.println("========================================\n");
+  out.println("========================================");
+  out.println("  Demonstration Complete!");
+  out.println("========================================\n");
 }
 
 // ======================
@@ -263,13 +263,13 @@ void demonstrateAll() {
 在 main.cpp 的 processCommand 函数中添加:
 
 } else if (cmd == "cube") {
-  grabCube();
+  grabCube(out);
 } else if (cmd == "cylinder") {
-  grabCylinder();
+  grabCylinder(out);
 } else if (cmd == "hat") {
-  grabHat();
+  grabHat(out);
 } else if (cmd == "boat") {
-  grabBoat();
+  grabBoat(out);
 }
 
 然后通过串口发送命令:
@@ -1,15 +1,18 @@
 #ifndef PRESET_ACTIONS_H
 #define PRESET_ACTIONS_H
 
+#include <Arduino.h>
+
 // Function declarations for preset actions
+// Progress messages go to 'out' (Serial, or the UDP reply packet)
 
 // Grab functions for different objects
-void grabCube();
-void grabCylinder();
-void grabHat();
-void grabBoat();
+void grabCube(Print &out);
+void grabCylinder(Print &out);
+void grabHat(Print &out);
+void grabBoat(Print &out);
 
 // Demonstration and utility functions
-void demonstrateAll();
+void demonstrateAll(Print &out);
 
 #endif
@@ -0,0 +1,176 @@
+// WiFi UDP 指令通道
+// 与串口使用相同的命令集，每个数据包带序号，命令输出作为回复包发回，上位机根据回复判断丢包并重发
+// 在 platformio.ini 的 build_flags 中设置 WIFI_SSID / WIFI_PASSWORD 后启用
+
+#include <Arduino.h>
+#include <ESP8266WiFi.h>
+#include <WiFiUdp.h>
+#include "WIFI_LINK.h"
+#include "MOTION_QUEUE.h"
+
+#ifndef WIFI_SSID
+#define WIFI_SSID ""
+#endif
+
+#ifndef WIFI_PASSWORD
+#define WIFI_PASSWORD ""
+#endif
+
+#define UDP_PACKET_SIZE 96
+#define UDP_REPLY_LIMIT 1400  // 回复超过该长度时截断 (help 等长输出)
+#define SEQ_WINDOW 32         // 记住最近多少个序号是否已执行
+
+// 外部声明 (在 main.cpp 中定义)
+extern void handleLine(char* line, Print &out);
+
+WiFiUDP udp;
+bool wifiEnabled = false;
+bool udpStarted = false;
+
+// 最近一个上位机的地址、收到的最大序号，以及 [lastSeq-31, lastSeq] 中已执行的序号
+// (bit i 对应 lastSeq - i)；丢包后重发的旧序号只要没执行过就照常执行
+IPAddress lastRemoteIp;
+uint16_t lastRemotePort = 0;
+unsigned long lastSeq = 0;
+uint32_t executedMask = 0;
+
+enum SeqResult { SEQ_NEW, SEQ_DUPLICATE, SEQ_STALE };
+
+// 把命令输出写入当前回复包，并统计字节数 (没有输出时回复 ok)
+class UdpReply : public Print {
+public:
+  size_t length = 0;
+  
+  size_t write(uint8_t c) override {
+    if (length >= UDP_REPLY_LIMIT) {
+      return 0;
+    }
+    length++;
+    return udp.write(c);
+  }
+};
+
+void setupWifiLink() {
+  if (strlen(WIFI_SSID) == 0) {
+    Serial.println("WiFi: disabled (set WIFI_SSID in platformio.ini)");
+    return;
+  }
+  
+  // 不在这里等待连接，loop 中连上后再打开 UDP 端口
+  WiFi.mode(WIFI_STA);
+  WiFi.begin(WIFI_SSID, WIFI_PASSWORD);
+  wifiEnabled = true;
+  Serial.print("WiFi: connecting to ");
+  Serial.println(WIFI_SSID);
+}
+
+void sendReply(unsigned long seq, const char* text) {
+  udp.beginPacket(udp.remoteIP(), udp.remotePort());
+  udp.print(seq);
+  udp.print(' ');
+  udp.print(text);
+  udp.endPacket();
+}
+
+SeqResult acceptSeq(unsigned long seq) {
+  if (seq > lastSeq) {
+    unsigned long shift = seq - lastSeq;
+    executedMask = shift >= SEQ_WINDOW ? 0 : executedMask << shift;
+    executedMask |= 1;
+    lastSeq = seq;
+    return SEQ_NEW;
+  }
+  
+  unsigned long offset = lastSeq - seq;
+  if (offset >= SEQ_WINDOW) {
+    return SEQ_STALE;  // Too old to know whether it ran
+  }
+  uint32_t bit = 1UL << offset;
+  if (executedMask & bit) {
+    return SEQ_DUPLICATE;
+  }
+  executedMask |= bit;  // Lost earlier, arrived late via retransmit
+  return SEQ_NEW;
+}
+
+bool isReadOnlyCommand(const char* command) {
+  return strcmp(command, "ping") == 0 || strcmp(command, "stats") == 0 ||
+         strcmp(command, "status") == 0 || strcmp(command, "qstatus") == 0 ||
+         strcmp(command, "power") == 0 || strcmp(command, "help") == 0;
+}
+
+void serviceWifiLink() {
+  if (!wifiEnabled) {
+    return;
+  }
+  
+  if (!udpStarted) {
+    if (WiFi.status() == WL_CONNECTED) {
+      udp.begin(WIFI_UDP_PORT);
+      udpStarted = true;
+      Serial.print("WiFi: UDP listening on ");
+      Serial.print(WiFi.localIP());
+      Serial.print(':');
+      Serial.println(WIFI_UDP_PORT);
+    }
+    return;
+  }
+  
+  int size = udp.parsePacket();
+  if (size <= 0) {
+    return;
+  }
+  
+  char packet[UDP_PACKET_SIZE];
+  int len = udp.read(packet, UDP_PACKET_SIZE - 1);
+  packet[len > 0 ? len : 0] = '\0';
+  
+  char* space = strchr(packet, ' ');
+  if (space == NULL) {
+    return;  // No sequence number: ignore
+  }
+  *space = '\0';
+  unsigned long seq = strtoul(packet, NULL, 10);
+  char* command = space + 1;
+  
+  if (size > len) {
+    sendReply(seq, "error too long");
+    return;
+  }
+  
+  // 新的上位机 (IP或端口变化) 重新开始计数
+  if (udp.remoteIP() != lastRemoteIp || udp.remotePort() != lastRemotePort) {
+    lastRemoteIp = udp.remoteIP();
+    lastRemotePort = udp.remotePort();
+    lastSeq = 0;
+    executedMask = 0;
+  }
+  
+  SeqResult result = acceptSeq(seq);
+  if (result == SEQ_STALE) {
+    // 无法确认是否执行过: 回复错误，上位机计为丢失而不是已送达
+    sendReply(seq, "error stale");
+    return;
+  }
+  
+  udp.beginPacket(udp.remoteIP(), udp.remotePort());
+  udp.print(seq);
+  udp.print(' ');
+  UdpReply reply;
+  if (result == SEQ_NEW || isReadOnlyCommand(command)) {
+    unsigned long rejects = motionQueueRejects();
+    handleLine(command, reply);
+    if (motionQueueRejects() != rejects) {
+      // 队列满没有加入: 不算已执行，回复丢失后的重发会再尝试加入
+      executedMask &= ~(1UL << (lastSeq - seq));
+    }
+  } else if (strncmp(command, "queue ", 6) == 0) {
+    // 已执行的 queue 重发: 回复当前队列状态，供上位机流量控制
+    printQueueStatus(reply);
+  }
+  // 其余已执行过的命令 (回复丢失后的重发) 不重复执行，只确认
+  if (reply.length == 0) {
+    udp.print("ok");
+  }
+  udp.endPacket();
+}
@@ -0,0 +1,14 @@
+#ifndef WIFI_LINK_H
+#define WIFI_LINK_H
+
+// WiFi UDP command link (optional alternative to USB serial)
+// Packet format:  "<seq> <command>"   e.g. "42 set 1 90"
+// Reply format:   "<seq> <command output>" (may span several lines), "<seq> ok" when the
+//                 command printed nothing, "<seq> error stale|too long" when it was not run
+
+#define WIFI_UDP_PORT 4210
+
+void setupWifiLink();
+void serviceWifiLink();
+
+#endif
@@ -1,6 +1,9 @@
 #include <Arduino.h>
 #include <Servo.h>
 #include "PRESET_ACTIONS.h"
+#include "WIFI_LINK.h"
+#include "MOTION_QUEUE.h"
+#include "POWER_SCHEDULER.h"
 
 /* 
  * ISDN 2601 Final Project - 5-Servo Mechanical Arm
@@ -19,15 +22,22 @@ Servo servo4;  // Elbow
 Servo servo5;  // Gripper
 
 // Function declarations (forward declarations)
-void printHelp();
-void printStatus();
-void resetPosition();
-void openGripper();
-void closeGripper();
-void processCommand(String cmd);
-void setServoAngle(int servoNum, int angle);
-void moveAllServos(int angles[]);
+void printHelp(Print &out);
+void printStatus(Print &out);
+void resetPosition(Print &out);
+void openGripper(Print &out);
+void closeGripper(Print &out);
+void processCommand(String cmd, Print &out);
+void setServoAngle(int servoNum, int angle, Print &out);
+void moveAllServos(int angles[], Print &out);
+unsigned long moveServosScheduled(const int target[5]);
+void writeServo(int index, int angle);
 int parseAngles(String str, int* angles, int maxCount);
+void serviceSerial();
+void handleLine(char* line, Print &out);
+void printStats(Print &out);
+bool isDirectMotionCommand(const String &cmd);
+void resetStats();
 
 // ESP8266 Pin assignments (Extension board labels -> GPIO)
 // Refer to project document Table for pin mapping
@@ -47,6 +57,42 @@ int pos5 = 90;
 // Movement step size for WASD control
 const int STEP_SIZE = 5;  // Degrees to move per key press
 
+// Serial line buffer (non-blocking, filled one byte at a time in loop)
+#define RX_BUFFER_SIZE 64
+char rxBuffer[RX_BUFFER_SIZE];
+size_t rxLength = 0;
+bool rxDiscarding = false;  // True while skipping the rest of an over-long line
+
+// Timing statistics (microseconds), reported by the 'stats' command
+struct TimingStat {
+  unsigned long minUs;
+  unsigned long maxUs;
+  unsigned long long sumUs;
+  unsigned long count;
+};
+
+TimingStat loopStat;
+TimingStat parseStat;
+TimingStat execStat;
+unsigned long lastLoopMicros = 0;
+unsigned long lastExecUs = 0;
+unsigned long rxOverflowCount = 0;
+unsigned long rxHwOverrunCount = 0;
+
+void recordTiming(TimingStat &stat, unsigned long us) {
+  if (stat.count == 0 || us < stat.minUs) stat.minUs = us;
+  if (us > stat.maxUs) stat.maxUs = us;
+  stat.sumUs += us;
+  stat.count++;
+}
+
+void clearTiming(TimingStat &stat) {
+  stat.minUs = 0;
+  stat.maxUs = 0;
+  stat.sumUs = 0;
+  stat.count = 0;
+}
+
 void setup() {
   Serial.begin(115200);
   delay(100);
@@ -76,25 +122,87 @@ void setup() {
   servo4.write(pos4);
   servo5.write(pos5);
   
+  setupWifiLink();
+  
   delay(1000);
   Serial.println("\nSystem ready!\n");
-  printHelp();
+  printHelp(Serial);
 }
 
 void loop() {
-  // Check for serial commands
-  if (Serial.available() > 0) {
-    String input = Serial.readStringUntil('\n');
-    input.trim();
+  // Loop period (includes time spent executing commands)
+  unsigned long now = micros();
+  if (lastLoopMicros != 0) {
+    recordTiming(loopStat, now - lastLoopMicros);
+  }
+  lastLoopMicros = now;
+  
+  // Check for serial and WiFi commands without blocking
+  serviceSerial();
+  serviceWifiLink();
+  
+  // Advance queued waypoints
+  serviceMotionQueue();
+}
+
+void serviceSerial() {
+  if (Serial.hasOverrun()) {
+    rxHwOverrunCount++;
+  }
+  
+  while (Serial.available() > 0) {
+    char c = Serial.read();
     
-    processCommand(input);
+    if (c == '\n') {
+      if (!rxDiscarding) {
+        rxBuffer[rxLength] = '\0';
+        handleLine(rxBuffer, Serial);
+      }
+      rxLength = 0;
+      rxDiscarding = false;
+      return;  // One command per loop pass keeps the loop period bounded
+    }
+    
+    if (rxDiscarding) {
+      continue;
+    }
+    
+    if (rxLength < RX_BUFFER_SIZE - 1) {
+      rxBuffer[rxLength++] = c;
+    } else {
+      // Line too long: drop it and resync at the next newline
+      rxDiscarding = true;
+      rxOverflowCount++;
+      Serial.println("Error: Command too long");
+    }
+  }
+}
+
+void handleLine(char* line, Print &out) {
+  unsigned long parseStart = micros();
+  String input(line);
+  input.trim();
+  input.toLowerCase();
+  recordTiming(parseStat, micros() - parseStart);
+  
+  if (input.length() == 0) {
+    return;
   }
   
-  delay(10);
+  unsigned long execStart = micros();
+  processCommand(input, out);
+  lastExecUs = micros() - execStart;
+  recordTiming(execStat, lastExecUs);
 }
 
-void processCommand(String cmd) {
-  cmd.toLowerCase();
+void processCommand(String cmd, Print &out) {
+  // cmd is already trimmed and lower-cased by handleLine()
+  
+  // Direct motion commands take over from the waypoint queue
+  if (motionQueueBusy() && isDirectMotionCommand(cmd)) {
+    clearMotionQueue();
+    out.println("Queue cleared");
+  }
   
   // WASD keyboard control
   if (cmd == "w") {
@@ -102,111 +210,122 @@ void processCommand(String cmd) {
     int newAngle = constrain(pos3 + STEP_SIZE, 0, 180);
     servo3.write(newAngle);
     pos3 = newAngle;
-    Serial.print("W: Shoulder UP -> ");
-    Serial.print(pos3);
-    Serial.println("°");
+    out.print("W: Shoulder UP -> ");
+    out.print(pos3);
+    out.println("°");
     
   } else if (cmd == "s") {
     // S - Shoulder down (servo3 decrease angle)
     int newAngle = constrain(pos3 - STEP_SIZE, 0, 180);
     servo3.write(newAngle);
     pos3 = newAngle;
-    Serial.print("S: Shoulder DOWN -> ");
-    Serial.print(pos3);
-    Serial.println("°");
+    out.print("S: Shoulder DOWN -> ");
+    out.print(pos3);
+    out.println("°");
     
   } else if (cmd == "a") {
     // A - Base rotate left (servo2 increase angle)
     int newAngle = constrain(pos2 + STEP_SIZE, 0, 180);
     servo2.write(newAngle);
     pos2 = newAngle;
-    Serial.print("A: Base LEFT -> ");
-    Serial.print(pos2);
-    Serial.println("°");
+    out.print("A: Base LEFT -> ");
+    out.print(pos2);
+    out.println("°");
     
   } else if (cmd == "d") {
     // D - Base rotate right (servo2 decrease angle)
     int newAngle = constrain(pos2 - STEP_SIZE, 0, 180);
     servo2.write(newAngle);
     pos2 = newAngle;
-    Serial.print("D: Base RIGHT -> ");
-    Serial.print(pos2);
-    Serial.println("°");
+    out.print("D: Base RIGHT -> ");
+    out.print(pos2);
+    out.println("°");
     
   } else if (cmd == "q") {
     // Q - Elbow up (servo4 decrease angle)
     int newAngle = constrain(pos4 - STEP_SIZE, 0, 180);
     servo4.write(newAngle);
     pos4 = newAngle;
-    Serial.print("Q: Elbow UP -> ");
-    Serial.print(pos4);
-    Serial.println("°");
+    out.print("Q: Elbow UP -> ");
+    out.print(pos4);
+    out.println("°");
     
   } else if (cmd == "e") {
     // E - Elbow down (servo4 increase angle)
     int newAngle = constrain(pos4 + STEP_SIZE, 0, 180);
     servo4.write(newAngle);
     pos4 = newAngle;
-    Serial.print("E: Elbow DOWN -> ");
-    Serial.print(pos4);
-    Serial.println("°");
+    out.print("E: Elbow DOWN -> ");
+    out.print(pos4);
+    out.println("°");
     
   } else if (cmd == "z") {
     // Z - Wrist up (servo1 increase angle)
     int newAngle = constrain(pos1 + STEP_SIZE, 0, 180);
     servo1.write(newAngle);
     pos1 = newAngle;
-    Serial.print("Z: Wrist UP -> ");
-    Serial.print(pos1);
-    Serial.println("°");
+    out.print("Z: Wrist UP -> ");
+    out.print(pos1);
+    out.println("°");
     
   } else if (cmd == "x") {
     // X - Wrist down (servo1 decrease angle)
     int newAngle = constrain(pos1 - STEP_SIZE, 0, 180);
     servo1.write(newAngle);
     pos1 = newAngle;
-    Serial.print("X: Wrist DOWN -> ");
-    Serial.print(pos1);
-    Serial.println("°");
+    out.print("X: Wrist DOWN -> ");
+    out.print(pos1);
+    out.println("°");
     
   } else if (cmd == "help" || cmd == "h") {
-    printHelp();
+    printHelp(out);
+    
+  } else if (cmd == "ping") {
+    // Used by the GUI to detect that the firmware is ready
+    out.println("pong");
+    
+  } else if (cmd == "stats") {
+    printStats(out);
+    
+  } else if (cmd == "stats reset") {
+    resetStats();
+    out.println("Stats reset");
     
   } else if (cmd == "status" || cmd == "s") {
-    printStatus();
+    printStatus(out);
     
   } else if (cmd == "reset" || cmd == "r") {
-    resetPosition();
+    resetPosition(out);
     
   } else if (cmd == "open") {
-    openGripper();
+    openGripper(out);
     
   } else if (cmd == "close") {
-    closeGripper();
+    closeGripper(out);
     
   } else if (cmd == "[") {
     // [ - Open gripper quickly
-    openGripper();
+    openGripper(out);
     
   } else if (cmd == "]") {
     // ] - Close gripper quickly
-    closeGripper();
+    closeGripper(out);
     
   } else if (cmd == "save") {
     // Save current position (print for recording)
-    Serial.println("\n=== Current Position (Copy for PRESET_ACTIONS.cpp) ===");
-    Serial.print("servo1.write("); Serial.print(pos1); Serial.println(");  // Wrist");
-    Serial.print("servo2.write("); Serial.print(pos2); Serial.println(");  // Base");
-    Serial.print("servo3.write("); Serial.print(pos3); Serial.println(");  // Shoulder");
-    Serial.print("servo4.write("); Serial.print(pos4); Serial.println(");  // Elbow");
-    Serial.print("servo5.write("); Serial.print(pos5); Serial.println(");  // Gripper");
-    Serial.print("\n// Or use: move ");
-    Serial.print(pos1); Serial.print(" ");
-    Serial.print(pos2); Serial.print(" ");
-    Serial.print(pos3); Serial.print(" ");
-    Serial.print(pos4); Serial.print(" ");
-    Serial.println(pos5);
-    Serial.println("======================================================\n");
+    out.println("\n=== Current Position (Copy for PRESET_ACTIONS.cpp) ===");
+    out.print("servo1.write("); out.print(pos1); out.println(");  // Wrist");
+    out.print("servo2.write("); out.print(pos2); out.println(");  // Base");
+    out.print("servo3.write("); out.print(pos3); out.println(");  // Shoulder");
+    out.print("servo4.write("); out.print(pos4); out.println(");  // Elbow");
+    out.print("servo5.write("); out.print(pos5); out.println(");  // Gripper");
+    out.print("\n// Or use: move ");
+    out.print(pos1); out.print(" ");
+    out.print(pos2); out.print(" ");
+    out.print(pos3); out.print(" ");
+    out.print(pos4); out.print(" ");
+    out.println(pos5);
+    out.println("======================================================\n");
     
   } else if (cmd.startsWith("set ")) {
     // Format: set 1 90 (servo number, angle)
@@ -217,9 +336,9 @@ void processCommand(String cmd) {
       int servoNum = cmd.substring(space1 + 1, space2).toInt();
       int angle = cmd.substring(space2 + 1).toInt();
       
-      setServoAngle(servoNum, angle);
+      setServoAngle(servoNum, angle, out);
     } else {
-      Serial.println("Error: Use format 'set <servo> <angle>'");
+      out.println("Error: Use format 'set <servo> <angle>'");
     }
     
   } else if (cmd.startsWith("move ")) {
@@ -228,82 +347,179 @@ void processCommand(String cmd) {
     int count = parseAngles(cmd.substring(5), angles, 5);
     
     if (count == 5) {
-      moveAllServos(angles);
+      moveAllServos(angles, out);
+    } else {
+      out.println("Error: Need 5 angles. Use 'move <a1> <a2> <a3> <a4> <a5>'");
+    }
+    
+  } else if (cmd.startsWith("pose ")) {
+    // Format: pose 90 45 120 60 30
+    // Like move, but without delay or echo so the host can stream poses
+    int angles[5];
+    int count = parseAngles(cmd.substring(5), angles, 5);
+    
+    if (count == 5) {
+      servo1.write(constrain(angles[0], 0, 180));
+      servo2.write(constrain(angles[1], 0, 180));
+      servo3.write(constrain(angles[2], 0, 180));
+      servo4.write(constrain(angles[3], 0, 180));
+      servo5.write(constrain(angles[4], 0, 180));
+      pos1 = constrain(angles[0], 0, 180);
+      pos2 = constrain(angles[1], 0, 180);
+      pos3 = constrain(angles[2], 0, 180);
+      pos4 = constrain(angles[3], 0, 180);
+      pos5 = constrain(angles[4], 0, 180);
     } else {
-      Serial.println("Error: Need 5 angles. Use 'move <a1> <a2> <a3> <a4> <a5>'");
+      out.println("Error: Need 5 angles. Use 'pose <a1> <a2> <a3> <a4> <a5>'");
     }
     
+  } else if (cmd == "power") {
+    out.print("Power budget: ");
+    out.print(getPowerBudget());
+    out.println(" mA (0 = unlimited)");
+    
+  } else if (cmd.startsWith("power ")) {
+    // Format: power 800 (estimated servo current budget in mA, 0 = unlimited)
+    setPowerBudget(cmd.substring(6).toInt());
+    out.print("Power budget: ");
+    out.print(getPowerBudget());
+    out.println(" mA");
+    
+  } else if (cmd.startsWith("queue ")) {
+    // Format: queue 90 45 120 60 30 [duration_ms]
+    int values[6];
+    int count = parseAngles(cmd.substring(6), values, 6);
+    
+    if (count == 5 || count == 6) {
+      unsigned long durationMs = (count == 6 && values[5] > 0) ? values[5] : 0;
+      bool accepted = enqueueWaypoint(values, durationMs);
+      printQueueStatus(out, !accepted);  // "Q full ..." tells the host to resend later
+    } else {
+      out.println("Error: Use 'queue <a1> <a2> <a3> <a4> <a5> [ms]'");
+    }
+    
+  } else if (cmd == "qstatus") {
+    printQueueStatus(out);
+    
+  } else if (cmd == "qclear") {
+    clearMotionQueue();
+    printQueueStatus(out);
+    
+  } else if (cmd.startsWith("qblend ")) {
+    // Format: qblend 150 (ms before each corner to start the next segment, 0 = off)
+    setMotionBlend(max(0L, cmd.substring(7).toInt()));
+    printQueueStatus(out);
+    
   } else if (cmd == "cube") {
-    grabCube();
+    grabCube(out);
   } else if (cmd == "cylinder") {
-    grabCylinder();
+    grabCylinder(out);
   } else if (cmd == "hat") {
-    grabHat();
+    grabHat(out);
   } else if (cmd == "boat") {
-    grabBoat();
+    grabBoat(out);
   } else {
-    Serial.println("Unknown command. Type 'help' for command list.");
+    out.println("Unknown command. Type 'help' for command list.");
   }
 }
 
-void printHelp() {
-  Serial.println("===== Available Commands =====");
-  Serial.println("=== WASD Keyboard Control ===");
-  Serial.println("  a / d    - Base LEFT / RIGHT (Servo2)");
-  Serial.println("  w / s    - Shoulder UP / DOWN (Servo3)");
-  Serial.println("  q / e    - Elbow UP / DOWN (Servo4)");
-  Serial.println("  z / x    - Wrist UP / DOWN (Servo1)");
-  Serial.println("  [ / ]    - Gripper OPEN / CLOSE (Servo5)");
-  Serial.println("");
-  Serial.println("=== Quick Commands ===");
-  Serial.println("  help                  - Show this help");
-  Serial.println("  status                - Show current servo positions");
-  Serial.println("  reset                 - Reset all servos to init position");
-  Serial.println("  set <servo> <angle>   - Set servo N to angle (e.g., set 1 45)");
-  Serial.println("  move <a1> .. <a5>     - Move all servos (e.g., move 90 60 120 45 30)");
-  Serial.println("  open                  - Open gripper (servo5 -> 30°)");
-  Serial.println("  close                 - Close gripper (servo5 -> 90°)");
-  Serial.println("  save                  - Print current angles (for recording)");
-  Serial.println("==============================\n");
+void printHelp(Print &out) {
+  out.println("===== Available Commands =====");
+  out.println("=== WASD Keyboard Control ===");
+  out.println("  a / d    - Base LEFT / RIGHT (Servo2)");
+  out.println("  w / s    - Shoulder UP / DOWN (Servo3)");
+  out.println("  q / e    - Elbow UP / DOWN (Servo4)");
+  out.println("  z / x    - Wrist UP / DOWN (Servo1)");
+  out.println("  [ / ]    - Gripper OPEN / CLOSE (Servo5)");
+  out.println("");
+  out.println("=== Quick Commands ===");
+  out.println("  help                  - Show this help");
+  out.println("  status                - Show current servo positions");
+  out.println("  reset                 - Reset all servos to init position");
+  out.println("  set <servo> <angle>   - Set servo N to angle (e.g., set 1 45)");
+  out.println("  move <a1> .. <a5>     - Move all servos (e.g., move 90 60 120 45 30)");
+  out.println("  pose <a1> .. <a5>     - Move all servos at once, no delay/echo (streaming)");
+  out.println("  queue <a1> .. <a5> [ms] - Add waypoint to motion queue");
+  out.println("  qstatus / qclear      - Show / clear motion queue");
+  out.println("  qblend <ms>           - Corner blending time (0 = off)");
+  out.println("  power [mA]            - Show / set servo current budget for move/reset");
+  out.println("  open                  - Open gripper (servo5 -> 30°)");
+  out.println("  close                 - Close gripper (servo5 -> 90°)");
+  out.println("  save                  - Print current angles (for recording)");
+  out.println("  ping                  - Reply 'pong' (connection check)");
+  out.println("  stats                 - Print loop/command timing (stats reset to clear)");
+  out.println("==============================\n");
 }
 
-void printStatus() {
-  Serial.println("\n=== Current Positions ===");
-  Serial.print("  Servo1 (Wrist):    "); Serial.print(pos1); Serial.println("°");
-  Serial.print("  Servo2 (Base):     "); Serial.print(pos2); Serial.println("°");
-  Serial.print("  Servo3 (Shoulder): "); Serial.print(pos3); Serial.println("°");
-  Serial.print("  Servo4 (Elbow):    "); Serial.print(pos4); Serial.println("°");
-  Serial.print("  Servo5 (Gripper):  "); Serial.print(pos5); Serial.println("°");
-  Serial.println("========================\n");
+void printStatus(Print &out) {
+  out.println("\n=== Current Positions ===");
+  out.print("  Servo1 (Wrist):    "); out.print(pos1); out.println("°");
+  out.print("  Servo2 (Base):     "); out.print(pos2); out.println("°");
+  out.print("  Servo3 (Shoulder): "); out.print(pos3); out.println("°");
+  out.print("  Servo4 (Elbow):    "); out.print(pos4); out.println("°");
+  out.print("  Servo5 (Gripper):  "); out.print(pos5); out.println("°");
+  out.println("========================\n");
 }
 
-void resetPosition() {
-  Serial.println("Resetting to init position...");
-  
-  pos1 = 90;
-  pos2 = 45;
-  pos3 = 100;
-  pos4 = 0;
-  pos5 = 90;
+void printTimingField(Print &out, const char* name, TimingStat &stat) {
+  // Format: name=min/avg/max
+  out.print(name);
+  out.print('=');
+  out.print(stat.minUs);
+  out.print('/');
+  out.print(stat.count ? (unsigned long)(stat.sumUs / stat.count) : 0UL);
+  out.print('/');
+  out.print(stat.maxUs);
+  out.print(' ');
+}
+
+void printStats(Print &out) {
+  // Single line so the GUI can poll and parse it:
+  // STATS loop_us=min/avg/max parse_us=... exec_us=... last_exec_us=N loops=N cmds=N
+  //       rx_overflow=N rx_hw_overrun=N heap=N uptime_ms=N
+  out.print("STATS ");
+  printTimingField(out, "loop_us", loopStat);
+  printTimingField(out, "parse_us", parseStat);
+  printTimingField(out, "exec_us", execStat);
+  out.print("last_exec_us="); out.print(lastExecUs);
+  out.print(" loops="); out.print(loopStat.count);
+  out.print(" cmds="); out.print(execStat.count);
+  out.print(" rx_overflow="); out.print(rxOverflowCount);
+  out.print(" rx_hw_overrun="); out.print(rxHwOverrunCount);
+  out.print(" heap="); out.print(ESP.getFreeHeap());
+  out.print(" uptime_ms="); out.println(millis());
+}
+
+void resetStats() {
+  clearTiming(loopStat);
+  clearTiming(parseStat);
+  clearTiming(execStat);
+  lastExecUs = 0;
+  rxOverflowCount = 0;
+  rxHwOverrunCount = 0;
+  lastLoopMicros = 0;
+}
+
+void resetPosition(Print &out) {
+  out.println("Resetting to init position...");
   
-  servo1.write(pos1);
-  servo2.write(pos2);
-  servo3.write(pos3);
-  servo4.write(pos4);
-  servo5.write(pos5);
+  int initPose[5] = {90, 45, 100, 0, 90};
+  unsigned long elapsed = moveServosScheduled(initPose);
   
-  delay(500);
-  Serial.println("Reset complete!\n");
+  if (elapsed < 500) {
+    delay(500 - elapsed);
+  }
+  out.println("Reset complete!\n");
 }
 
-void setServoAngle(int servoNum, int angle) {
+void setServoAngle(int servoNum, int angle, Print &out) {
   if (servoNum < 1 || servoNum > 5) {
-    Serial.println("Error: Servo number must be 1-5");
+    out.println("Error: Servo number must be 1-5");
     return;
   }
   
   if (angle < 0 || angle > 180) {
-    Serial.println("Error: Angle must be 0-180");
+    out.println("Error: Angle must be 0-180");
     return;
   }
   
@@ -311,72 +527,114 @@ void setServoAngle(int servoNum, int angle) {
     case 1:
       servo1.write(angle);
       pos1 = angle;
-      Serial.print("Servo1 -> ");
+      out.print("Servo1 -> ");
       break;
     case 2:
       servo2.write(angle);
       pos2 = angle;
-      Serial.print("Servo2 -> ");
+      out.print("Servo2 -> ");
       break;
     case 3:
       servo3.write(angle);
       pos3 = angle;
-      Serial.print("Servo3 -> ");
+      out.print("Servo3 -> ");
       break;
     case 4:
       servo4.write(angle);
       pos4 = angle;
-      Serial.print("Servo4 -> ");
+      out.print("Servo4 -> ");
       break;
     case 5:
       servo5.write(angle);
       pos5 = angle;
-      Serial.print("Servo5 -> ");
+      out.print("Servo5 -> ");
       break;
   }
   
-  Serial.print(angle);
-  Serial.println("°");
+  out.print(angle);
+  out.println("°");
 }
 
-void moveAllServos(int angles[]) {
-  Serial.println("Moving all servos...");
-  
-  servo1.write(angles[0]);
-  servo2.write(angles[1]);
-  servo3.write(angles[2]);
-  servo4.write(angles[3]);
-  servo5.write(angles[4]);
+void moveAllServos(int angles[], Print &out) {
+  out.println("Moving all servos...");
   
-  pos1 = angles[0];
-  pos2 = angles[1];
-  pos3 = angles[2];
-  pos4 = angles[3];
-  pos5 = angles[4];
+  unsigned long elapsed = moveServosScheduled(angles);
   
-  delay(500);
-  Serial.print("Positions: ");
+  if (elapsed < 500) {
+    delay(500 - elapsed);
+  }
+  out.print("Positions: ");
   for (int i = 0; i < 5; i++) {
-    Serial.print(angles[i]);
-    if (i < 4) Serial.print(", ");
+    out.print(angles[i]);
+    if (i < 4) out.print(", ");
   }
-  Serial.println("\n");
+  out.println("\n");
 }
 
-void openGripper() {
-  Serial.println("Opening gripper...");
+void writeServo(int index, int angle) {
+  // index 0-4 -> servo1-servo5, no serial output
+  switch (index) {
+    case 0: servo1.write(angle); pos1 = angle; break;
+    case 1: servo2.write(angle); pos2 = angle; break;
+    case 2: servo3.write(angle); pos3 = angle; break;
+    case 3: servo4.write(angle); pos4 = angle; break;
+    case 4: servo5.write(angle); pos5 = angle; break;
+  }
+}
+
+unsigned long moveServosScheduled(const int target[5]) {
+  // Start each servo at its scheduled offset so the estimated current
+  // stays within the power budget; returns the time spent (ms)
+  int from[5] = {pos1, pos2, pos3, pos4, pos5};
+  unsigned long startMs[5];
+  unsigned long total = schedulePowerAware(from, target, startMs);
+  
+  bool written[5] = {false, false, false, false, false};
+  int remaining = 5;
+  unsigned long start = millis();
+  
+  while (remaining > 0) {
+    unsigned long elapsed = millis() - start;
+    for (int i = 0; i < 5; i++) {
+      if (!written[i] && elapsed >= startMs[i]) {
+        writeServo(i, target[i]);
+        written[i] = true;
+        remaining--;
+      }
+    }
+    if (remaining > 0) {
+      delay(1);
+    }
+  }
+  
+  // Wait for the last servo to arrive
+  while (millis() - start < total) {
+    delay(1);
+  }
+  return total;
+}
+
+void openGripper(Print &out) {
+  out.println("Opening gripper...");
   servo5.write(30);
   pos5 = 30;
   delay(500);
-  Serial.println("Gripper opened!\n");
+  out.println("Gripper opened!\n");
 }
 
-void closeGripper() {
-  Serial.println("Closing gripper...");
+void closeGripper(Print &out) {
+  out.println("Closing gripper...");
   servo5.write(90);
   pos5 = 90;
   delay(500);
-  Serial.println("Gripper closed!\n");
+  out.println("Gripper closed!\n");
+}
+
+bool isDirectMotionCommand(const String &cmd) {
+  return (cmd.length() == 1 && cmd != "h") ||  // WASD / [ ] keys, r
+         cmd == "reset" || cmd == "open" || cmd == "close" ||
+         cmd.startsWith("set ") || cmd.startsWith("move ") || cmd.startsWith("pose ") ||
+         cmd == "cube" || cmd == "cylinder" || cmd == "hat" || cmd == "boat";
 }
 
 int parseAngles(String str, int* angles, int maxCount) {